@@ -5,6 +5,7 @@ Compare GNN predictions against historical reality
 
 import torch
 import numpy as np
+from torch_geometric.data import Batch
 from model import ImpactPredictor
 from incident_loader import load_real_incidents
 import json
@@ -20,16 +21,17 @@ class BacktestEngine:
     would it have predicted what actually happened?"
     """
     
-    def __init__(self, model_path: str, model_name: str = "Model"):
+    def __init__(self, model_path: str, model_name: str = "Model", predictor: ImpactPredictor = None):
         """
         Initialize backtest engine with a trained model.
         
         Args:
             model_path: Path to model checkpoint
             model_name: Human-readable name for reports
+            predictor: Optional already-loaded predictor (model_path is then not reloaded)
         """
         self.model_name = model_name
-        self.predictor = ImpactPredictor(model_path=model_path)
+        self.predictor = predictor if predictor is not None else ImpactPredictor(model_path=model_path)
         self.predictor.model.eval()
         self.device = self.predictor.device
         
@@ -48,7 +50,7 @@ class BacktestEngine:
         """
         data = data.to(self.device)
         
-        with torch.no_grad():
+        with torch.inference_mode():
             logits = self.predictor.model(data.x, data.edge_index, data.edge_attr)
             probs = torch.sigmoid(logits)
         
@@ -57,6 +59,35 @@ class BacktestEngine:
         
         return predictions, ground_truth
     
+    def predict_incidents(self, incidents) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Predict outcomes for several incidents in one forward pass.
+        
+        Incidents are merged into one disconnected graph (PyG Batch); in
+        eval mode each incident's outputs match predict_incident.
+        
+        Args:
+            incidents: List of PyTorch Geometric Data objects
+            
+        Returns:
+            List of (predictions, ground_truth), one per incident
+        """
+        if len(incidents) == 0:
+            return []
+        
+        batch = Batch.from_data_list(incidents).to(self.device)
+        
+        with torch.inference_mode():
+            logits = self.predictor.model(batch.x, batch.edge_index, batch.edge_attr, batch.batch)
+            probs = torch.sigmoid(logits)
+        
+        # Split node rows back into incidents using the batch offsets
+        offsets = batch.ptr[1:-1].cpu().numpy()
+        predictions = np.split(probs.cpu().numpy(), offsets)
+        ground_truth = np.split(batch.y.cpu().numpy(), offsets)
+        
+        return list(zip(predictions, ground_truth))
+    
     def evaluate_ranking(self, predictions: np.ndarray, ground_truth: np.ndarray, k: int = 5) -> Dict:
         """
         Evaluate if model correctly identifies top-K at-risk nodes.
@@ -126,7 +157,26 @@ class BacktestEngine:
             Dict with detailed results
         """
         predictions, ground_truth = self.predict_incident(data)
+        return self._score_incident(data, predictions, ground_truth, k)
+    
+    def backtest_incidents(self, incidents, k: int = 5) -> List[Dict]:
+        """
+        Run backtest on several incidents with a single batched forward pass.
         
+        Args:
+            incidents: List of PyTorch Geometric Data objects
+            k: Top-K nodes for ranking evaluation
+            
+        Returns:
+            List of result dicts, one per incident (same format as backtest_incident)
+        """
+        return [
+            self._score_incident(data, predictions, ground_truth, k)
+            for data, (predictions, ground_truth) in zip(incidents, self.predict_incidents(incidents))
+        ]
+    
+    def _score_incident(self, data, predictions: np.ndarray, ground_truth: np.ndarray, k: int) -> Dict:
+        """Compute metrics for one incident from its predictions"""
         # Get known labels mask
         mask = ground_truth >= 0
         known_count = mask.sum()
@@ -212,17 +262,16 @@ class BacktestEngine:
         
         print(f"✓ Loaded {len(incidents)} incidents\n")
         
-        # Run backtest on each incident
+        # Run backtest on all incidents in one batched pass
         self.results = []
+        results = self.backtest_incidents(incidents, k=k)
         
-        for i, data in enumerate(incidents):
+        for i, (data, result) in enumerate(zip(incidents, results)):
             print(f"\n{'='*70}")
             print(f"Incident {i+1}/{len(incidents)}: {data.incident_id}")
             print(f"Date: {data.date}")
             print(f"{'='*70}")
             
-            result = self.backtest_incident(data, k=k)
-            
             if 'error' in result:
                 print(f"⚠ {result['error']}")
                 continue
@@ -226,7 +226,7 @@ def evaluate_fine_tuning(
     
     results = []
     
-    with torch.no_grad():
+    with torch.inference_mode():
         for i, data in enumerate(test_incidents):
             data = data.to(device)
             
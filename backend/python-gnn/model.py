@@ -3,7 +3,15 @@ Real Graph Neural Network for Infrastructure Impact Prediction
 Uses PyTorch Geometric with actual learnable parameters
 """
 
+import copy
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
 import torch
+from torch import Tensor
 import torch.nn as nn
 import torch.nn.functional as F
 from torch_geometric.nn import GCNConv, GATConv, global_mean_pool
@@ -11,6 +19,37 @@ from torch_geometric.data import Data, Batch
 from torch_geometric.utils import add_self_loops
 
 
+# Opt-in on-disk cache for predict_with_threshold (set VILLAGE_GNN_CACHE=1)
+PREDICTION_CACHE_DIR = Path.home() / ".cache" / "village-gnn"
+
+# Below this many edges the extra host cast + device widening in _to_device
+# costs more than the halved edge_index transfer saves (1 MiB of int64 indices)
+INT32_EDGE_TRANSFER_MIN_EDGES = 1 << 16
+
+
+def _hash_inputs(*arrays, **kwargs):
+    """blake2b digest over array bytes (with shape/dtype) and keyword arguments"""
+    digest = hashlib.blake2b(digest_size=20)
+    for value in arrays:
+        if value is None:
+            digest.update(b"none")
+            continue
+        if torch.is_tensor(value):
+            value = value.detach().cpu().numpy()
+        value = np.ascontiguousarray(value)
+        digest.update(f"{value.dtype.str}{value.shape}".encode())
+        digest.update(value.tobytes())
+    digest.update(repr(sorted(kwargs.items())).encode())
+    return digest.hexdigest()
+
+
+def default_amp_dtype():
+    """bf16 autocast dtype on CUDA devices that support it, else None (fp32)"""
+    if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+        return torch.bfloat16
+    return None
+
+
 class FocalLoss(nn.Module):
     """Focal Loss for addressing class imbalance and hard examples"""
     def __init__(self, alpha=0.75, gamma=2.0, pos_weight=None):
@@ -46,7 +85,7 @@ class InfrastructureGNN(nn.Module):
         self.output_dim = output_dim
         
         # Gated Status Veto: Learned gate controls when status overrides neighborhood
-        self.status_veto_weight = status_veto_weight
+        self.status_veto_weight = float(status_veto_weight)
         
         # Gate network: learns when to trust status signal
         # Takes node embedding and outputs per-dimension gating coefficients
@@ -80,7 +119,8 @@ class InfrastructureGNN(nn.Module):
         
         self.dropout = nn.Dropout(dropout)
         
-    def forward(self, x, edge_index, edge_weight=None, batch=None):
+    def forward(self, x: Tensor, edge_index: Tensor, edge_weight: Optional[Tensor] = None,
+                batch: Optional[Tensor] = None):
         """
         Forward pass through the GNN
         
@@ -93,6 +133,20 @@ class InfrastructureGNN(nn.Module):
         Returns:
             Node-level predictions [num_nodes, output_dim]
         """
+        embedding, gnn_logits = self.encode(x, edge_index, edge_weight)
+        return self.head(x, embedding, gnn_logits)
+    
+    def encode(self, x: Tensor, edge_index: Tensor, edge_weight: Optional[Tensor] = None):
+        """
+        Run the GNN body (layers 1-4) without the gated status veto.
+        
+        The result only depends on the graph, so it can be reused across
+        several head() calls (e.g. sweeping status_veto_weight).
+        
+        Returns:
+            embedding: Final pre-gate node embedding [num_nodes, hidden_dim]
+            gnn_logits: Layer 4 logits before the veto [num_nodes, output_dim]
+        """
         # Add self-loops to handle disconnected nodes
         edge_index, edge_weight = add_self_loops(edge_index, edge_weight, num_nodes=x.size(0))
         
@@ -124,6 +178,38 @@ class InfrastructureGNN(nn.Module):
         # LAYER 4: Output projection (48→12)
         x_out = self.conv4(x3, edge_index, edge_weight)
         
+        return x3, x_out
+    
+    def forward_with_gate(self, x: Tensor, edge_index: Tensor, edge_weight: Optional[Tensor] = None):
+        """
+        Forward pass that also returns the learned gate activations.
+        
+        Returns:
+            logits: Raw logits [num_nodes, output_dim]
+            gate: Gate values in [0, 1] [num_nodes, output_dim]
+        """
+        embedding, gnn_logits = self.encode(x, edge_index, edge_weight)
+        gate = self.gate_network(embedding)
+        return self.head(x, embedding, gnn_logits, gate=gate), gate
+    
+    def head(self, x: Tensor, embedding: Tensor, gnn_logits: Tensor,
+             status_veto_weight: Optional[float] = None, gate: Optional[Tensor] = None):
+        """
+        Apply the gated status veto to encode() outputs.
+        
+        Args:
+            x: Node features [num_nodes, input_dim] (status read from index 12)
+            embedding: Final node embedding from encode()
+            gnn_logits: Layer 4 logits from encode()
+            status_veto_weight: Optional α override (default: self.status_veto_weight)
+            gate: Optional precomputed gate_network(embedding)
+            
+        Returns:
+            Raw logits [num_nodes, output_dim]
+        """
+        if status_veto_weight is None:
+            status_veto_weight = self.status_veto_weight
+        
         # GATED STATUS VETO: Learned skip connection for failure override
         # Architecture: final_logits = gnn_logits + α * failure_flag * gate(embedding) * signal
         
@@ -138,7 +224,8 @@ class InfrastructureGNN(nn.Module):
         # Step 3: Compute learned gate from final node embedding
         # Gate decides HOW MUCH to trust the status signal per output dimension
         # gate ∈ [0, 1]^12 - learned contextual trust in status
-        gate = self.gate_network(x3)  # [num_nodes, 12]
+        if gate is None:
+            gate = self.gate_network(embedding)  # [num_nodes, 12]
         
         # Step 4: Project failure severity to impact space
         # Converts scalar "degree of failure" to 12-dim impact vector
@@ -149,12 +236,12 @@ class InfrastructureGNN(nn.Module):
         # Only activates for failed nodes (failure_flag=1)
         # Gate modulates strength per dimension based on learned context
         # Alpha scales overall veto strength
-        status_contribution = self.status_veto_weight * failure_flag * gate * status_signal
+        status_contribution = status_veto_weight * failure_flag * gate * status_signal
         
         # Step 6: Combine GNN reasoning with gated status veto
         # "I don't care how healthy the neighborhood is — THIS node is FAILED."
         # But only when the gate agrees (learned from data)
-        x_out = x_out + status_contribution
+        x_out = gnn_logits + status_contribution
         
         # Return raw logits (sigmoid will be applied by BCEWithLogitsLoss or at inference)
         return x_out
@@ -166,16 +253,62 @@ class ImpactPredictor:
     """
     
     def __init__(self, model_path=None, learning_rate=0.001, device=None, 
-                 use_focal_loss=False, temperature=1.0, status_veto_weight=2.5):
+                 use_focal_loss=False, temperature=1.0, status_veto_weight=2.5,
+                 amp_dtype=None, quantize=None, jit=False):
+        if quantize not in (None, "int8"):
+            raise ValueError(f"Unsupported quantize mode: {quantize!r} (expected None or 'int8')")
+        if quantize is not None and jit:
+            raise ValueError("quantize and jit are mutually exclusive")
+        
         if device is None:
-            self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+            # Dynamic int8 kernels are CPU-only
+            use_cuda = torch.cuda.is_available() and quantize is None
+            self.device = torch.device('cuda' if use_cuda else 'cpu')
         else:
-            self.device = device
+            self.device = torch.device(device)
+        if self.device.type == "cuda" and self.device.index is None:
+            # Pin the index: torch.device('cuda') != tensor.device ('cuda:0'),
+            # which would defeat the already-on-device checks in _to_device
+            self.device = torch.device("cuda", torch.cuda.current_device())
+        
+        if quantize is not None and self.device.type != "cpu":
+            raise ValueError("quantize='int8' requires device='cpu'")
         
         # Temperature scaling for sharper/softer predictions
         self.temperature = temperature
+        
+        # Mixed precision for forward passes (e.g. torch.bfloat16); None = full fp32
+        self.amp_dtype = amp_dtype
+        
+        # fp16 gradients can underflow, so scale the loss; bf16/fp32 don't need it
+        self.grad_scaler = torch.cuda.amp.GradScaler(enabled=amp_dtype == torch.float16)
+        
+        # Inference-only model variants: int8 dynamic quantization or TorchScript.
+        # The eager fp32 model is kept for training/checkpointing and the
+        # runtime copy is rebuilt lazily whenever the weights change
+        self.quantize = quantize
+        self.jit = jit
+        self._runtime_model = None
+        
+        # torch.compile wrapper for predictions (compile_for_inference); shares
+        # self.model's parameters, so unlike _runtime_model it never goes stale
+        self._compiled_model = None
+        
+        # (path, mtime) of the loaded checkpoint; None once weights diverge from it.
+        # _checkpoint_version is _weights_version() right after the load, so
+        # updates made outside train_step (external optimizers) are detected too
+        self._checkpoint_id = None
+        self._checkpoint_version = None
             
         self.model = InfrastructureGNN(status_veto_weight=status_veto_weight).to(self.device)
+        self.param_count = sum(p.numel() for p in self.model.parameters())
+        
+        # Module train_step runs: self.model, optionally wrapped in DDP
+        # (distribute_for_training) and/or torch.compile (compile_for_training).
+        # Wrappers share self.model's parameters
+        self._train_model = self.model
+        self._eager_train_model = self.model
+        self._train_model_checked = True
         self.optimizer = torch.optim.Adam(self.model.parameters(), lr=learning_rate, weight_decay=5e-4)
         
         # Learning rate scheduler - reduces LR when validation loss plateaus
@@ -192,36 +325,123 @@ class ImpactPredictor:
         
         if model_path:
             self.load_model(model_path)
+        
+        if jit:
+            # Script and warm up now so the first real predict isn't the slow one
+            self.inference_model()
     
     def train_step(self, data_batch):
-        """Single training step with weighted loss"""
+        """
+        Single training step with weighted loss
+        
+        Returns the detached loss tensor (still on the device), so callers
+        can accumulate it without a device→host sync per step.
+        """
         self.model.train()
+        self._runtime_model = None  # Weights change; rebuild on next predict
+        self._checkpoint_id = None
         self.optimizer.zero_grad()
         
-        # Move data to device
-        data_batch = data_batch.to(self.device)
+        # Move data to device (async when the loader hands out pinned batches)
+        data_batch = data_batch.to(self.device, non_blocking=True)
         
-        # Forward pass
-        out = self.model(data_batch.x, data_batch.edge_index, data_batch.edge_attr, data_batch.batch)
+        with self.autocast():
+            # Forward pass
+            out = self._train_forward(data_batch)
+            
+            # Compute loss with weighting for critical failures
+            loss_per_node = self.criterion(out, data_batch.y)
+            
+            # Weight critical nodes (avg impact > 0.5) 3x more
+            weights = torch.ones_like(data_batch.y)
+            critical_mask = data_batch.y.mean(dim=1) > 0.5
+            weights[critical_mask] = 3.0
+            
+            # Apply weights and compute final loss
+            weighted_loss = (loss_per_node * weights).mean()
         
-        # Compute loss with weighting for critical failures
-        loss_per_node = self.criterion(out, data_batch.y)
+        # Backward pass (optimizer step stays in fp32 master weights)
+        self.grad_scaler.scale(weighted_loss).backward()
+        self.grad_scaler.step(self.optimizer)
+        self.grad_scaler.update()
         
-        # Weight critical nodes (avg impact > 0.5) 3x more
-        weights = torch.ones_like(data_batch.y)
-        critical_mask = data_batch.y.mean(dim=1) > 0.5
-        weights[critical_mask] = 3.0
+        return weighted_loss.detach()
+    
+    def distribute_for_training(self, device_ids=None):
+        """
+        Run train_step through DistributedDataParallel(self.model).
         
-        # Apply weights and compute final loss
-        weighted_loss = (loss_per_node * weights).mean()
+        Requires an initialised torch.distributed process group. Call before
+        compile_for_training(). Gradients are all-reduced across ranks, while
+        self.model (and its checkpoints) stays unwrapped.
+        """
+        from torch.nn.parallel import DistributedDataParallel
         
-        # Backward pass
-        weighted_loss.backward()
-        self.optimizer.step()
+        self._train_model = DistributedDataParallel(self.model, device_ids=device_ids)
+        self._eager_train_model = self._train_model
+    
+    def compile_for_training(self, **compile_kwargs):
+        """
+        Run train_step through torch.compile(self.model, **compile_kwargs).
         
-        return weighted_loss.item()
+        The compiled wrapper shares parameters with self.model, so
+        checkpoints (state_dict keys) and inference paths are unaffected.
+        If compilation fails on the first step, training continues eagerly.
+        """
+        self._train_model = torch.compile(self._eager_train_model, **compile_kwargs)
+        self._train_model_checked = False
     
-    def predict(self, x, edge_index, edge_weight=None):
+    def compile_for_inference(self, example_graph=None, **compile_kwargs):
+        """
+        Run predictions through torch.compile(self.model, **compile_kwargs).
+        
+        Compiles and warms up immediately, so most failures surface here
+        (predictions then stay eager). Pass the graph you will predict on as
+        example_graph=(x, edge_index[, edge_weight]) so the warm-up compiles
+        the shapes that matter; otherwise a 2-node graph is used. If a later
+        recompile fails, predict() drops the compiled model and runs eagerly.
+        Not combinable with quantize or jit, which replace the model instead.
+        """
+        if self.quantize is not None or self.jit:
+            raise ValueError("compile_for_inference can't be combined with quantize or jit")
+        
+        if example_graph is None:
+            example_graph = (
+                torch.rand(2, self.model.input_dim),
+                torch.tensor([[0, 1], [1, 0]])
+            )
+        x, edge_index, edge_weight = self._to_device(*example_graph)
+        
+        compiled = torch.compile(self.model, **compile_kwargs)
+        self.model.eval()
+        try:
+            with torch.inference_mode():
+                with self.autocast():
+                    compiled(x, edge_index, edge_weight)
+        except Exception as e:
+            print(f"⚠️  torch.compile failed, predicting eagerly: {e}")
+            return
+        
+        self._compiled_model = compiled
+    
+    def _train_forward(self, data_batch):
+        """Training forward pass, falling back to eager if torch.compile fails"""
+        args = (data_batch.x, data_batch.edge_index, data_batch.edge_attr, data_batch.batch)
+        if self._train_model_checked:
+            return self._train_model(*args)
+        
+        # Dynamo compiles lazily, so failures only surface on the first call
+        try:
+            out = self._train_model(*args)
+        except Exception as e:
+            print(f"⚠️  torch.compile failed, training eagerly: {e}")
+            self._train_model = self._eager_train_model
+            out = self._train_model(*args)
+        
+        self._train_model_checked = True
+        return out
+    
+    def predict(self, x, edge_index, edge_weight=None, temperature=None):
         """
         Predict impact for a single graph (returns probabilities).
         
@@ -229,37 +449,142 @@ class ImpactPredictor:
             x: Node features [num_nodes, 24]
             edge_index: Edge connections [2, num_edges]
             edge_weight: Edge weights [num_edges]
+            temperature: Optional override of self.temperature for this call
             
         Returns:
             Impact probabilities [num_nodes, 12] (values 0.0-1.0)
         """
-        self.model.eval()
+        x, edge_index, edge_weight = self._to_device(x, edge_index, edge_weight)
+        
+        with torch.inference_mode():
+            logits = self.inference_logits(x, edge_index, edge_weight)
+            probabilities = self._to_probabilities(logits, temperature)
         
-        # Convert to tensors if needed
-        if not isinstance(x, torch.Tensor):
-            x = torch.tensor(x, dtype=torch.float32)
-        if not isinstance(edge_index, torch.Tensor):
-            edge_index = torch.tensor(edge_index, dtype=torch.long)
-        if edge_weight is not None and not isinstance(edge_weight, torch.Tensor):
-            edge_weight = torch.tensor(edge_weight, dtype=torch.float32)
+        return probabilities.cpu().numpy()
+    
+    def inference_logits(self, x, edge_index, edge_weight=None, batch=None):
+        """
+        Raw logits from inference_model() for device tensors, under autocast.
         
-        x = x.to(self.device)
-        edge_index = edge_index.to(self.device)
+        Call inside torch.inference_mode(). If the torch.compile model fails
+        (e.g. recompiling for new input shapes), it is dropped and this and
+        every later call run the eager model instead.
+        """
+        model = self.inference_model()
+        try:
+            with self.autocast():
+                return model(x, edge_index, edge_weight, batch)
+        except Exception as e:
+            if model is not self._compiled_model:
+                raise
+            print(f"⚠️  torch.compile failed, predicting eagerly: {e}")
+            self._compiled_model = None
+            with self.autocast():
+                return self.model(x, edge_index, edge_weight, batch)
+    
+    def inference_model(self):
+        """
+        Model used for predictions, in eval mode.
+        
+        With quantize="int8" this is a dynamic-quantized copy of self.model:
+        nn.Linear layers (gate network) run int8 weights, while the PyG conv
+        layers use their own Linear type and stay in fp32. With jit=True it
+        is a frozen TorchScript copy (falls back to the eager model if the
+        PyG layers can't be scripted). After compile_for_inference() it is
+        the torch.compile wrapper.
+        """
+        self.model.eval()
+        if self.quantize is None and not self.jit:
+            return self.model if self._compiled_model is None else self._compiled_model
+        
+        if self._runtime_model is None:
+            if self.quantize == "int8":
+                self._runtime_model = torch.ao.quantization.quantize_dynamic(
+                    copy.deepcopy(self.model), {nn.Linear}, dtype=torch.qint8
+                )
+            else:
+                self._runtime_model = self._script_model()
+        return self._runtime_model
+    
+    def _script_model(self):
+        """TorchScript copy of self.model for inference, or self.model on failure"""
+        model = copy.deepcopy(self.model).eval()
+        try:
+            for name in ("conv1", "conv2", "conv3", "conv4"):
+                setattr(model, name, getattr(model, name).jittable())
+            scripted = torch.jit.optimize_for_inference(
+                torch.jit.script(model), other_methods=["encode", "head"]
+            )
+        except Exception as e:
+            print(f"⚠️  TorchScript compilation failed, using eager model: {e}")
+            self.jit = False
+            return self.model
+        
+        # Warm up the profiling executor on a representative graph
+        x = torch.rand(2, model.input_dim, device=self.device)
+        edge_index = torch.tensor([[0, 1], [1, 0]], device=self.device)
+        with torch.inference_mode():
+            for _ in range(2):
+                scripted(x, edge_index)
+        
+        return scripted
+    
+    def _to_device(self, x, edge_index, edge_weight=None):
+        """Convert graph inputs (NumPy arrays or tensors) to tensors on self.device"""
+        x = self._as_device_tensor(x, torch.float32)
+        
+        on_device = torch.is_tensor(edge_index) and edge_index.device == self.device
+        num_edges = len(edge_index[0])
+        if (self.device.type == "cuda" and not on_device
+                and num_edges >= INT32_EDGE_TRANSFER_MIN_EDGES and x.shape[0] < 2**31):
+            # Ship indices as int32 (half the host→device bytes); PyG's scatter
+            # path still needs int64, so widen once on the device
+            edge_index = self._as_device_tensor(edge_index, torch.int32).long()
+        else:
+            edge_index = self._as_device_tensor(edge_index, torch.long)
         if edge_weight is not None:
-            edge_weight = edge_weight.to(self.device)
+            edge_weight = self._as_device_tensor(edge_weight, torch.float32)
         
-        with torch.no_grad():
-            logits = self.model(x, edge_index, edge_weight)
-            
-            # Apply temperature scaling (T < 1.0 = sharper, T > 1.0 = softer)
-            calibrated_logits = logits / self.temperature
-            
-            # Apply sigmoid to get probabilities (0-1 range)
-            probabilities = torch.sigmoid(calibrated_logits)
+        return x, edge_index, edge_weight
+    
+    def _as_device_tensor(self, value, dtype):
+        """
+        Move one input to self.device, copying only when needed.
         
-        return probabilities.cpu().numpy()
+        NumPy arrays of the right dtype are wrapped without a copy, and
+        tensors already on the right device/dtype are returned unchanged.
+        """
+        if not torch.is_tensor(value):
+            value = torch.as_tensor(np.ascontiguousarray(value), dtype=dtype)
+        
+        if self.device.type == "cuda" and value.device.type == "cpu":
+            # Pinned source memory lets the host→device copy run asynchronously
+            value = value.pin_memory()
+        
+        return value.to(self.device, dtype=dtype, non_blocking=True)
+    
+    def _to_probabilities(self, logits, temperature=None):
+        """Temperature-scale logits and map them to probabilities"""
+        if temperature is None:
+            temperature = self.temperature
+        
+        # Apply temperature scaling (T < 1.0 = sharper, T > 1.0 = softer)
+        # Kept in fp32 so low-precision logits don't skew the sigmoid
+        calibrated_logits = logits.float() / temperature
+        
+        # Apply sigmoid to get probabilities (0-1 range)
+        return torch.sigmoid(calibrated_logits)
+    
+    def autocast(self):
+        """Autocast context for forward passes (no-op unless amp_dtype is set)"""
+        return torch.autocast(
+            self.device.type,
+            dtype=self.amp_dtype or torch.bfloat16,
+            enabled=(self.amp_dtype is not None and self.quantize is None and not self.jit
+                     and self.device.type in ("cuda", "cpu"))
+        )
     
-    def predict_with_threshold(self, x, edge_index, edge_weight=None, threshold=0.5):
+    def predict_with_threshold(self, x, edge_index, edge_weight=None, threshold=0.5, temperature=None):
         """
         Predict impact with inference-time threshold (decision boundary).
         
@@ -274,15 +599,96 @@ class ImpactPredictor:
             threshold: Decision boundary (default: 0.5)
                       - Lower (0.3): More sensitive, more alerts
                       - Higher (0.7): Less sensitive, fewer alerts
+            temperature: Optional override of self.temperature for this call
             
         Returns:
             probabilities: [num_nodes, 12] - Raw probability scores (0-1)
             alerts: [num_nodes, 12] - Boolean alerts (>= threshold)
             risk_level: str - Overall risk assessment
         """
+        cache_path = self._prediction_cache_path(x, edge_index, edge_weight, threshold, temperature)
+        if cache_path is not None and cache_path.exists():
+            with np.load(cache_path) as cached:
+                return cached["probabilities"], cached["alerts"], str(cached["risk_level"])
+        
         # Get raw probabilities
-        probabilities = self.predict(x, edge_index, edge_weight)
+        probabilities = self.predict(x, edge_index, edge_weight, temperature=temperature)
+        alerts, risk_level = self._apply_threshold(probabilities, threshold)
+        
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, probabilities=probabilities, alerts=alerts, risk_level=np.array(risk_level))
+            os.replace(tmp_path, cache_path)
+        
+        return probabilities, alerts, risk_level
+    
+    def _weights_version(self):
+        """
+        Total in-place version count of all parameters and buffers.
+        
+        Optimizer steps, load_state_dict and BatchNorm stat updates all bump
+        a tensor's version counter, and counters never decrease, so any
+        weight change since a snapshot shows up as a different total.
+        """
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return sum(t._version for t in tensors)
+    
+    def _prediction_cache_path(self, x, edge_index, edge_weight, threshold, temperature):
+        """
+        Cache file for a predict_with_threshold call, or None if caching is off.
         
+        Only enabled with VILLAGE_GNN_CACHE=1 and for weights that came
+        unchanged from a checkpoint on disk, so results stay reproducible.
+        """
+        if os.environ.get("VILLAGE_GNN_CACHE") != "1" or self._checkpoint_id is None:
+            return None
+        if self._weights_version() != self._checkpoint_version:
+            # Weights were updated in place since the load (e.g. fine-tuning)
+            self._checkpoint_id = None
+            return None
+        
+        key = _hash_inputs(
+            x, edge_index, edge_weight,
+            checkpoint=self._checkpoint_id,
+            threshold=float(threshold),
+            temperature=float(self.temperature if temperature is None else temperature),
+            status_veto_weight=float(self.model.status_veto_weight),
+            quantize=self.quantize,
+            amp_dtype=str(self.amp_dtype),
+        )
+        return PREDICTION_CACHE_DIR / f"{key}.npz"
+    
+    def predict_veto_sweep(self, x, edge_index, edge_weight=None, veto_weights=(2.5,), threshold=0.5):
+        """
+        Predict the same graph under several status veto weights (α).
+        
+        The GNN body runs once; only the cheap gated-veto head is
+        re-evaluated per α.
+        
+        Returns:
+            List of (probabilities, alerts, risk_level), one per veto weight
+        """
+        model = self.inference_model()
+        x, edge_index, edge_weight = self._to_device(x, edge_index, edge_weight)
+        
+        results = []
+        with torch.inference_mode():
+            with self.autocast():
+                embedding, gnn_logits = model.encode(x, edge_index, edge_weight)
+            
+            for alpha in veto_weights:
+                with self.autocast():
+                    logits = model.head(x, embedding, gnn_logits, status_veto_weight=float(alpha))
+                probabilities = self._to_probabilities(logits).cpu().numpy()
+                alerts, risk_level = self._apply_threshold(probabilities, threshold)
+                results.append((probabilities, alerts, risk_level))
+        
+        return results
+    
+    def _apply_threshold(self, probabilities, threshold):
+        """Turn probabilities into alerts and an overall risk level"""
         # Apply threshold (inference-time decision boundary)
         alerts = (probabilities >= threshold).astype(int)
         
@@ -299,7 +705,7 @@ class ImpactPredictor:
         else:
             risk_level = "🟢 LOW"
         
-        return probabilities, alerts, risk_level
+        return alerts, risk_level
     
     def set_temperature(self, temperature):
         """
@@ -333,6 +739,8 @@ class ImpactPredictor:
     def load_model(self, path):
         """Load model checkpoint (handles legacy models without status_veto)"""
         checkpoint = torch.load(path, map_location=self.device)
+        self._runtime_model = None
+        self._checkpoint_id = None
         
         # Try to load state dict, handling missing keys gracefully
         legacy_mode = False
@@ -358,5 +766,10 @@ class ImpactPredictor:
                     self.scheduler.load_state_dict(checkpoint['scheduler_state_dict'])
             except (ValueError, KeyError) as e:
                 print(f"⚠️  Skipping optimizer state (parameter mismatch): {e}")
+            
+            # Legacy loads have a randomly initialised gate, so never cache those
+            resolved = Path(path).resolve()
+            self._checkpoint_id = (str(resolved), resolved.stat().st_mtime_ns)
+            self._checkpoint_version = self._weights_version()
         
         print(f"Model loaded from {path}")
@@ -210,7 +210,10 @@ class GateRetrainer:
         if failed_nodes == 0:
             raise RuntimeError("❌ No failed nodes in dataset. Cannot train gate.")
         
-        return incidents
+        # Move to the device once, outside any inference_mode block: Data.to
+        # rebinds the stored tensors, and inference tensors can't be used by
+        # the training passes that follow
+        return [data.to(self.device) for data in incidents]
     
     def _compute_metrics(self, incidents: List[torch.Tensor]) -> Dict[str, float]:
         """
@@ -232,10 +235,8 @@ class GateRetrainer:
         failed_above_threshold = 0
         total_failed = 0
         
-        with torch.no_grad():
+        with torch.inference_mode():
             for data in incidents:
-                data = data.to(self.device)
-                
                 # Get predictions
                 logits = self.model(data.x, data.edge_index)
                 probs = torch.sigmoid(logits).cpu().numpy()
@@ -332,8 +333,6 @@ class GateRetrainer:
         n_batches = 0
         
         for data in incidents:
-            data = data.to(self.device)
-            
             # Forward pass
             self.optimizer.zero_grad()
             logits = self.model(data.x, data.edge_index)
@@ -371,10 +370,8 @@ class GateRetrainer:
         self.model.eval()
         all_gates = []
         
-        with torch.no_grad():
+        with torch.inference_mode():
             for data in incidents:
-                data = data.to(self.device)
-                
                 # Forward through conv layers to get x3
                 x = data.x
                 edge_index = data.edge_index
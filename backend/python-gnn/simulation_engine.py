@@ -24,10 +24,11 @@ SIMULATION MODES:
   • Anchors to topology weight to prevent hallucinations
 """
 
+import sys
 import torch
 import numpy as np
 from enum import IntEnum
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -44,6 +45,32 @@ class FailureMode(IntEnum):
     CONTROL_FAILURE = 4   # Valve/sensor malfunction
 
 
+# Pessimistic alert levels, indexed by the codes in run_simulation()["alert_levels_np"]
+ALERT_LEVELS = ("normal", "elevated", "high", "critical")
+ALERT_ICONS = np.array(["🟢", "🟡", "🟠", "🔴"])
+ALERT_THRESHOLDS = np.array([0.2, 0.5, 0.8])  # Lower bounds of elevated/high/critical
+
+
+def amplify(delta, topology_weight):
+    """
+    Pessimistic amplification: (Δ ^ 0.5) × 2.0 × topology_weight.
+    Works element-wise on scalars or arrays (delta must be >= 0).
+    """
+    return np.sqrt(delta) * 2.0 * topology_weight
+
+
+def alert_level_codes(amplified):
+    """Map amplified deltas to ALERT_LEVELS codes (element-wise)."""
+    return np.searchsorted(ALERT_THRESHOLDS, amplified, side="right")
+
+
+def to_numpy(value):
+    """NumPy view of a tensor or array (copies only for device/grad tensors)."""
+    if torch.is_tensor(value):
+        return value.detach().cpu().numpy()
+    return np.asarray(value)
+
+
 @dataclass
 class SemanticInterpretation:
     """Semantic interpretation of a delta value based on failure mode context."""
@@ -182,13 +209,13 @@ class SimulationEngine:
             
         return confidence, label
     
-    def _calculate_pessimistic_delta(
+    def _calculate_pessimistic_deltas(
         self,
-        raw_delta: float,
-        topology_weight: float
-    ) -> Tuple[float, str]:
+        deltas: np.ndarray,
+        topology_weights: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Failure-biased amplification for admin what-if simulations.
+        Failure-biased amplification for admin what-if simulations, for all nodes at once.
         Loud on risk, quiet on relief.
         
         The GNN computes what changes (physics).
@@ -203,43 +230,30 @@ class SimulationEngine:
         • Admin always sees worst-case impact
         • Physics stays honest
         
+        Relief (negative delta) is suppressed to 0.1 × Δ with alert level "normal".
+        
         Args:
-            raw_delta: Original delta from GNN
-            topology_weight: Node's topology weight (0-1)
+            deltas: Original deltas from GNN [N]
+            topology_weights: Per-node topology weights (0-1) [N]
             
         Returns:
-            Tuple of (pessimistic_delta, alert_level)
+            Tuple of (pessimistic_deltas [N], alert level codes into ALERT_LEVELS [N])
         """
-        # Amplify only RISK INCREASE (positive delta)
-        if raw_delta > 0:
-            # Non-linear boost: small deltas become visible
-            # sqrt(0.01) * 2 = 0.2, sqrt(0.05) * 2 = 0.45, sqrt(0.1) * 2 = 0.63
-            amplified = (raw_delta ** 0.5) * 2.0
-            
-            # Anchor to topology confidence (0-1) to prevent hallucinations
-            pessimistic = amplified * topology_weight
-            
-            # Determine alert level based on amplified value
-            if pessimistic >= 0.8:
-                alert_level = "critical"
-            elif pessimistic >= 0.5:
-                alert_level = "high"
-            elif pessimistic >= 0.2:
-                alert_level = "elevated"
-            else:
-                alert_level = "normal"
-                
-            return min(pessimistic, 1.0), alert_level
+        # Non-linear boost: small deltas become visible
+        # sqrt(0.01) * 2 = 0.2, sqrt(0.05) * 2 = 0.45, sqrt(0.1) * 2 = 0.63
+        # Anchored to topology confidence (0-1) to prevent hallucinations
+        risk = deltas > 0
+        amplified = amplify(np.where(risk, deltas, 0.0), topology_weights)
         
-        # Suppress relief (negative delta) - still show but quiet
-        suppressed = raw_delta * 0.1
-        return suppressed, "normal"
+        pessimistic = np.where(risk, np.minimum(amplified, 1.0), deltas * 0.1)
+        alert_levels = np.where(risk, alert_level_codes(amplified), 0).astype(np.int8)
+        return pessimistic, alert_levels
         
     def run_simulation(
         self,
-        x: np.ndarray,
-        edge_index: np.ndarray,
-        edge_weight: np.ndarray,
+        x: Union[np.ndarray, torch.Tensor],
+        edge_index: Union[np.ndarray, torch.Tensor],
+        edge_weight: Optional[Union[np.ndarray, torch.Tensor]],
         failed_nodes: List[int],
         node_names: Optional[List[str]] = None,
         failure_mode: FailureMode = FailureMode.NONE,
@@ -249,9 +263,9 @@ class SimulationEngine:
         Run delta-inference simulation with semantic interpretation.
         
         Args:
-            x: Node features [N, F]
-            edge_index: Edge connectivity [2, E]
-            edge_weight: Edge weights [E]
+            x: Node features [N, F] (NumPy array or tensor)
+            edge_index: Edge connectivity [2, E] (NumPy array or tensor)
+            edge_weight: Edge weights [E], or None for unit weights
             failed_nodes: List of node indices to force-fail
             node_names: Optional human-readable node names
             failure_mode: Context for semantic interpretation
@@ -271,7 +285,7 @@ class SimulationEngine:
         baseline_probs = baseline_probs[:, 0]  # Impact probability column
         
         # Step 2: Counterfactual - force target nodes to fail
-        x_sim = x.copy()
+        x_sim = x.clone() if torch.is_tensor(x) else x.copy()
         status_col = 12  # Status feature index
         
         for node_idx in failed_nodes:
@@ -286,16 +300,20 @@ class SimulationEngine:
         # Step 4: Compute deltas
         deltas = sim_probs - baseline_probs
         
-        # Step 5: Compute topology weights for confidence
-        topology_weights = self._compute_topology_weights(edge_index, edge_weight, num_nodes)
-        
-        # Step 6: Compute pessimistic deltas if in pessimistic mode
-        pessimistic_deltas = np.zeros(num_nodes)
-        if pessimistic_mode:
-            for i in range(num_nodes):
-                pessimistic_deltas[i], _ = self._calculate_pessimistic_delta(
-                    deltas[i], topology_weights[i]
-                )
+        # Step 5: Compute topology weights for confidence (the only NumPy consumer of the graph)
+        edge_index_np = to_numpy(edge_index)
+        if edge_weight is None:
+            edge_weight_np = np.ones(edge_index_np.shape[1], dtype=np.float32)
+        else:
+            edge_weight_np = to_numpy(edge_weight)
+        topology_weights = self._compute_topology_weights(edge_index_np, edge_weight_np, num_nodes)
+        
+        # Step 6: Compute pessimistic deltas and alert level codes (into ALERT_LEVELS)
+        # for every node at once; the interpretations always carry them, while the
+        # summary and alert_levels_np only report them in pessimistic mode
+        pessimistic_deltas, alert_levels = self._calculate_pessimistic_deltas(
+            deltas, topology_weights
+        )
         
         # Step 7: Build report with semantic interpretation
         report = []
@@ -306,6 +324,8 @@ class SimulationEngine:
                 is_source=(i in failed_nodes),
                 failure_mode=failure_mode,
                 topology_weight=topology_weights[i],
+                pessimistic_delta=float(pessimistic_deltas[i]),
+                alert_level=ALERT_LEVELS[alert_levels[i]],
                 pessimistic_mode=pessimistic_mode
             )
             
@@ -346,7 +366,10 @@ class SimulationEngine:
                 "baseline": baseline_probs.tolist(),
                 "simulated": sim_probs.tolist(),
                 "deltas": deltas.tolist()
-            }
+            },
+            # Per-node arrays in node_id order for vectorized consumers
+            "deltas_np": deltas,
+            "alert_levels_np": alert_levels if pessimistic_mode else np.zeros_like(alert_levels)
         }
     
     def _interpret_delta(
@@ -356,6 +379,8 @@ class SimulationEngine:
         is_source: bool,
         failure_mode: FailureMode,
         topology_weight: float = 1.0,
+        pessimistic_delta: float = 0.0,
+        alert_level: str = "normal",
         pessimistic_mode: bool = False
     ) -> SemanticInterpretation:
         """
@@ -372,6 +397,8 @@ class SimulationEngine:
             is_source: Whether this is the forced-fail node
             failure_mode: Context for interpretation
             topology_weight: Node's topology weight for confidence calculation
+            pessimistic_delta: Amplified delta from _calculate_pessimistic_deltas
+            alert_level: Alert level (from ALERT_LEVELS) for pessimistic_delta
             pessimistic_mode: If True, use failure-biased amplification
             
         Returns:
@@ -382,9 +409,6 @@ class SimulationEngine:
         # Compute confidence
         confidence, confidence_label = self._compute_confidence(delta, topology_weight)
         
-        # Compute pessimistic delta and alert level
-        pessimistic_delta, alert_level = self._calculate_pessimistic_delta(delta, topology_weight)
-        
         # Determine risk level based on magnitude (or pessimistic value if in that mode)
         effective_delta = pessimistic_delta if pessimistic_mode and delta > 0 else abs_delta
         
@@ -683,6 +707,19 @@ class SimulationEngine:
         return base_summary
 
 
+def create_simulation_engine(model_path, **predictor_kwargs):
+    """
+    Load an ImpactPredictor from a checkpoint and wrap it in a SimulationEngine.
+    
+    Args:
+        model_path: Path to the model checkpoint
+        **predictor_kwargs: Extra ImpactPredictor options (e.g. jit=True)
+    """
+    from model import ImpactPredictor
+    
+    return SimulationEngine(ImpactPredictor(str(model_path), **predictor_kwargs))
+
+
 def demo():
     """Demo the simulation engine with semantic interpretation and pessimistic mode."""
     print("="*70)
@@ -762,22 +799,30 @@ def demo():
     print(f"Affected Nodes: {result['summary']['affected_count']}")
     print(f"Max Pessimistic Δ: {result['summary']['max_pessimistic_delta']:.3f}")
     
-    for node in result["nodes"]:
+    # Collect node lines and write them in one call instead of one print per line
+    lines = []
+    nodes_by_id = {node["node_id"]: node for node in result["nodes"]}
+    for node_id in result["summary"]["failed_nodes"]:
+        node = nodes_by_id[node_id]
+        lines.append(f"  {node['interpretation'].ui_icon} {node['node_name']}: FAILURE SOURCE")
+    
+    # Only visit affected nodes (lower threshold in pessimistic mode), most affected first
+    deltas_np = result["deltas_np"]
+    affected = np.flatnonzero(np.abs(deltas_np) > 0.005)
+    affected = affected[~np.isin(affected, result["summary"]["failed_nodes"])]
+    affected = affected[np.argsort(-np.abs(deltas_np[affected]), kind="stable")]
+    
+    # Show alert level prominently
+    alert_icons = ALERT_ICONS[result["alert_levels_np"][affected]]
+    
+    for node_id, alert_icon in zip(affected, alert_icons):
+        node = nodes_by_id[node_id]
         interp = node["interpretation"]
-        if node["is_failed_source"]:
-            print(f"  {interp.ui_icon} {node['node_name']}: FAILURE SOURCE")
-        elif abs(node["delta"]) > 0.005:  # Lower threshold in pessimistic mode
-            # Show alert level prominently
-            alert_icon = {
-                "critical": "🔴",
-                "high": "🟠", 
-                "elevated": "🟡",
-                "normal": "🟢"
-            }.get(interp.alert_level, "⚪")
-            
-            print(f"  {alert_icon} {node['node_name']}: {interp.risk_type}")
-            print(f"     Raw Δ: {node['delta']:+.3f} → Amplified: {interp.pessimistic_delta:+.3f}")
-            print(f"     Alert: {interp.alert_level.upper()}")
+        lines.append(f"  {alert_icon} {node['node_name']}: {interp.risk_type}")
+        lines.append(f"     Raw Δ: {node['delta']:+.3f} → Amplified: {interp.pessimistic_delta:+.3f}")
+        lines.append(f"     Alert: {interp.alert_level.upper()}")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
     
     print(f"\n  Summary: {result['summary']['interpretation_summary']}")
     
@@ -789,12 +834,14 @@ def demo():
     
     print("\n  Raw Δ    →  Amplified (topology=1.0)")
     print("  ─────────────────────────────────────")
-    test_deltas = [0.01, 0.02, 0.05, 0.10, 0.15, 0.20, 0.30]
-    for d in test_deltas:
-        amp = (d ** 0.5) * 2.0 * 1.0
-        level = "CRITICAL" if amp >= 0.8 else "HIGH" if amp >= 0.5 else "ELEVATED" if amp >= 0.2 else "normal"
+    test_deltas = np.array([0.01, 0.02, 0.05, 0.10, 0.15, 0.20, 0.30])
+    amps = amplify(test_deltas, 1.0)
+    levels = np.array(["normal", "ELEVATED", "HIGH", "CRITICAL"])[alert_level_codes(amps)]
+    lines = []
+    for d, amp, level in zip(test_deltas, amps, levels):
         bar = "█" * int(min(amp, 1.0) * 20)
-        print(f"  {d:.2f}     →  {amp:.3f} [{bar:<20}] {level}")
+        lines.append(f"  {d:.2f}     →  {amp:.3f} [{bar:<20}] {level}")
+    sys.stdout.write("\n".join(lines) + "\n")
     
     # ========== COMPARISON ==========
     print("\n" + "="*70)
@@ -0,0 +1,64 @@
+"""
+Test the edge-feature cascade kernels agree
+
+train_with_edge_features.py labels its training graphs with one of two
+hand-written cascade implementations: the scalar-loop kernel (Numba-compiled
+when Numba is installed) or the vectorized NumPy fallback. Both must produce
+the same labels, whichever one a machine ends up using.
+"""
+
+import numpy as np
+from train_with_edge_features import (
+    HAS_NUMBA, propagate_cascade, _propagate_cascade_loops, _propagate_cascade_numpy
+)
+
+
+def _random_csr_graph(rng, num_nodes):
+    """Random directed graph as (indptr, indices, edge ids, edge quality), like the generator"""
+    num_connections = rng.integers(2, min(6, num_nodes), size=num_nodes)
+    picks = np.argsort(rng.random((num_nodes, num_nodes)), axis=1)[:, :5]
+    src = np.repeat(np.arange(num_nodes), num_connections)
+    dst = picks[np.arange(picks.shape[1]) < num_connections[:, None]]
+    not_self = src != dst
+    src, dst = src[not_self].astype(np.int64), dst[not_self].astype(np.int64)
+    
+    order = np.argsort(src, kind='stable')
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=num_nodes), out=indptr[1:])
+    edge_quality = rng.random(len(src), dtype=np.float32)
+    return indptr, dst[order], order, edge_quality
+
+
+def test_cascade_kernels_agree():
+    """Loop kernel and NumPy kernel produce the same y on fixed seeded graphs"""
+    print("=" * 70)
+    print("TEST: Cascade kernels agree")
+    print("=" * 70)
+    
+    # The loop kernel as training uses it: compiled if Numba is available
+    loop_kernel = propagate_cascade if HAS_NUMBA else _propagate_cascade_loops
+    print(f"\n  Loop kernel: {'Numba' if HAS_NUMBA else 'pure Python'}")
+    
+    rng = np.random.default_rng(0)
+    for trial in range(20):
+        num_nodes = int(rng.integers(10, 30))
+        indptr, indices, eids, edge_quality = _random_csr_graph(rng, num_nodes)
+        failure_node = int(rng.integers(num_nodes))
+        rand_pool = rng.random((num_nodes, 12), dtype=np.float32)
+        
+        y_init = np.zeros((num_nodes, 12), dtype=np.float32)
+        y_init[failure_node] = rng.random(12) * 0.2 + 0.7
+        y_loops, y_numpy = y_init.copy(), y_init.copy()
+        
+        loop_kernel(indptr, indices, eids, edge_quality, failure_node, y_loops, rand_pool)
+        _propagate_cascade_numpy(indptr, indices, eids, edge_quality, failure_node, y_numpy, rand_pool)
+        
+        # Same nodes reached, same values up to float32 rounding order
+        assert np.array_equal(y_loops != 0, y_numpy != 0), f"trial {trial}: reached sets differ"
+        np.testing.assert_allclose(y_loops, y_numpy, rtol=1e-5, atol=1e-7)
+    
+    print("  ✅ 20/20 seeded graphs: identical cascades")
+
+
+if __name__ == '__main__':
+    test_cascade_kernels_agree()
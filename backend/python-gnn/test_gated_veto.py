@@ -5,6 +5,7 @@ This test validates that the learned gate allows failed nodes to override
 neighborhood smoothing without breaking calibration or ranking.
 """
 
+import sys
 import torch
 import numpy as np
 from model import ImpactPredictor
@@ -28,54 +29,54 @@ def test_gated_veto_failed_node_detection():
     print("\n📊 Scenario: 1 FAILED node + 5 HEALTHY neighbors (strong topology)")
     print("   Goal: Failed node should be detected despite healthy context\n")
     
-    for alpha in veto_weights:
-        predictor = ImpactPredictor(
-            model_path=str(model_path),
-            temperature=0.5,  # Crisis mode
-            status_veto_weight=alpha
-        )
+    predictor = ImpactPredictor(
+        model_path=str(model_path),
+        temperature=0.5  # Crisis mode
+    )
+    
+    # Scenario: Failed critical tank surrounded by healthy infrastructure
+    x = torch.tensor([
+        # Node 0: FAILED TANK (status=0.0) - SHOULD TRIGGER ALERT
+        [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0,  # Type: Tank (critical)
+         0.0,  # status = 0.0 (FAILED!)
+         0.1, 0.0,  # level, flow = empty, no flow
+         0.95,  # criticality = very high
+         0.9, 0.8, 0.7,  # serves large population, high economic value
+         0.8, 0.9,  # high connectivity, good maintenance history
+         0.1, 0.1, 0.0],
         
-        # Scenario: Failed critical tank surrounded by healthy infrastructure
-        x = torch.tensor([
-            # Node 0: FAILED TANK (status=0.0) - SHOULD TRIGGER ALERT
-            [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0,  # Type: Tank (critical)
-             0.0,  # status = 0.0 (FAILED!)
-             0.1, 0.0,  # level, flow = empty, no flow
-             0.95,  # criticality = very high
-             0.9, 0.8, 0.7,  # serves large population, high economic value
-             0.8, 0.9,  # high connectivity, good maintenance history
-             0.1, 0.1, 0.0],
-            
-            # Nodes 1-5: All HEALTHY (status=0.9)
-            [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0,
-             0.9, 0.8, 0.9, 0.75, 0.4, 0.2, 0.5, 0.7, 0.8, 0.1, 0.1, 0.0],
-            
-            [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0,
-             0.9, 0.6, 0.7, 0.6, 0.3, 0.15, 0.4, 0.5, 0.6, 0.1, 0.1, 0.0],
-            
-            [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0,
-             0.9, 0.85, 0.95, 0.8, 0.5, 0.3, 0.6, 0.7, 0.85, 0.1, 0.1, 0.0],
-            
-            [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0,
-             0.9, 0.7, 0.8, 0.65, 0.35, 0.2, 0.45, 0.55, 0.7, 0.1, 0.1, 0.0],
-            
-            [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0,
-             0.9, 0.9, 0.85, 0.7, 0.45, 0.25, 0.55, 0.65, 0.75, 0.1, 0.1, 0.0],
-        ], dtype=torch.float32)
+        # Nodes 1-5: All HEALTHY (status=0.9)
+        [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0,
+         0.9, 0.8, 0.9, 0.75, 0.4, 0.2, 0.5, 0.7, 0.8, 0.1, 0.1, 0.0],
         
-        # Dense connectivity: failed tank feeds all downstream nodes
-        edge_index = torch.tensor([
-            [0, 0, 0, 0, 0, 1, 2, 3, 4],  # From
-            [1, 2, 3, 4, 5, 0, 0, 0, 0]   # To
-        ], dtype=torch.long)
+        [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0,
+         0.9, 0.6, 0.7, 0.6, 0.3, 0.15, 0.4, 0.5, 0.6, 0.1, 0.1, 0.0],
         
-        edge_weight = torch.tensor([0.9, 0.9, 0.85, 0.85, 0.8, 0.9, 0.9, 0.85, 0.85], dtype=torch.float32)
+        [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0,
+         0.9, 0.85, 0.95, 0.8, 0.5, 0.3, 0.6, 0.7, 0.85, 0.1, 0.1, 0.0],
         
-        # Predict
-        probs, alerts, risk = predictor.predict_with_threshold(
-            x.numpy(), edge_index.numpy(), edge_weight.numpy(), threshold=0.5
-        )
+        [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0,
+         0.9, 0.7, 0.8, 0.65, 0.35, 0.2, 0.45, 0.55, 0.7, 0.1, 0.1, 0.0],
         
+        [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0,
+         0.9, 0.9, 0.85, 0.7, 0.45, 0.25, 0.55, 0.65, 0.75, 0.1, 0.1, 0.0],
+    ], dtype=torch.float32)
+    
+    # Dense connectivity: failed tank feeds all downstream nodes
+    edge_index = torch.tensor([
+        [0, 0, 0, 0, 0, 1, 2, 3, 4],  # From
+        [1, 2, 3, 4, 5, 0, 0, 0, 0]   # To
+    ], dtype=torch.long)
+    
+    edge_weight = torch.tensor([0.9, 0.9, 0.85, 0.85, 0.8, 0.9, 0.9, 0.85, 0.85], dtype=torch.float32)
+    
+    # Predict: GNN body runs once, only the veto head is re-run per α
+    sweep = predictor.predict_veto_sweep(
+        x, edge_index, edge_weight,
+        veto_weights=veto_weights, threshold=0.5
+    )
+    
+    for alpha, (probs, alerts, risk) in zip(veto_weights, sweep):
         failed_prob = probs[0, 0]  # Node 0 impact probability
         healthy_avg = probs[1:, 0].mean()  # Average of healthy nodes
         
@@ -129,7 +130,7 @@ def test_ranking_stability():
     edge_weight = torch.tensor([0.9, 0.85], dtype=torch.float32)
     
     probs, _, _ = predictor.predict_with_threshold(
-        x.numpy(), edge_index.numpy(), edge_weight.numpy(), threshold=0.5
+        x, edge_index, edge_weight, threshold=0.5
     )
     
     print(f"Node 0 (Failed, status=0.0):     P = {probs[0, 0]:.4f}")
@@ -179,38 +180,22 @@ def test_gate_behavior():
     
     # Forward pass to check gate values
     predictor.model.eval()  # Set to eval mode to avoid batch norm issues
-    with torch.no_grad():
-        x_dev = x.to(predictor.device)
-        edge_index_dev = edge_index.to(predictor.device)
-        
-        # Get intermediate representations
-        x1 = predictor.model.conv1(x_dev, edge_index_dev)
-        x1 = predictor.model.bn1(x1)
-        x1 = torch.relu(x1)
-        
-        x_input_proj = predictor.model.input_projection(x_dev)
-        x2 = predictor.model.conv2(x1, edge_index_dev)
-        x2 = predictor.model.bn2(x2)
-        x2 = torch.relu(x2)
-        x2 = x2 + x_input_proj
-        
-        x3 = predictor.model.conv3(x2, edge_index_dev)
-        x3 = predictor.model.bn3(x3)
-        x3 = torch.relu(x3)
-        x3 = x3 + x1
-        
-        # Compute gate
-        gate = predictor.model.gate_network(x3)
-        
+    with torch.inference_mode():
+        _, gate = predictor.model.forward_with_gate(
+            x.to(predictor.device), edge_index.to(predictor.device)
+        )
+    
     gate_values = gate.cpu().numpy()[0]
     
     print(f"Gate activations (per output dimension):")
     dims = ["Impact", "Severity", "Time", "Water", "Power", "Road", "Building", 
             "Population", "Economic", "Recovery", "Priority", "Confidence"]
     
-    for i, (dim, val) in enumerate(zip(dims, gate_values)):
+    lines = []
+    for dim, val in zip(dims, gate_values):
         bar = "█" * int(val * 20)
-        print(f"  {dim:12s}: {val:.3f} {bar}")
+        lines.append(f"  {dim:12s}: {val:.3f} {bar}")
+    sys.stdout.write("\n".join(lines) + "\n")
     
     avg_gate = gate_values.mean()
     print(f"\n  Average gate: {avg_gate:.3f}")
@@ -232,57 +217,80 @@ def test_no_probability_explosion():
     if not model_path.exists():
         model_path = script_dir / "models" / "gnn_model.pt"
     
-    predictor = ImpactPredictor(
-        model_path=str(model_path),
-        temperature=0.5,
-        status_veto_weight=2.5
-    )
-    
-    print("\n📊 Testing probability range across 100 random graphs...")
-    
-    all_probs = []
-    
-    for _ in range(100):
-        # Random graph
-        num_nodes = np.random.randint(3, 10)
-        x = torch.rand(num_nodes, 24)
+    # Only the output distribution matters here, so probe the reduced-precision
+    # inference modes: bf16 autocast and int8 dynamic quantization (CPU)
+    probes = {
+        "bf16 autocast": ImpactPredictor(
+            model_path=str(model_path),
+            temperature=0.5,
+            status_veto_weight=2.5,
+            amp_dtype=torch.bfloat16
+        ),
+        "int8 quantized": ImpactPredictor(
+            model_path=str(model_path),
+            device="cpu",
+            temperature=0.5,
+            status_veto_weight=2.5,
+            quantize="int8"
+        ),
+    }
+    
+    # Reusable buffers sized for the largest graph
+    max_nodes = 9
+    x_buf = np.empty((max_nodes, 24), dtype=np.float32)
+    pair_buf = np.empty(max_nodes * max_nodes, dtype=np.float32)
+    ew_buf = np.empty(max_nodes * (max_nodes - 1), dtype=np.float32)
+    
+    for probe_name, predictor in probes.items():
+        print(f"\n📊 [{probe_name}] Testing probability range across 100 random graphs...")
         
-        # Random edges
-        edge_list = []
-        for i in range(num_nodes):
-            for j in range(num_nodes):
-                if i != j and np.random.rand() > 0.5:
-                    edge_list.append([i, j])
+        # One PCG64 stream per probe, same seed, so both see the same graphs
+        rng = np.random.default_rng(0)
+        all_probs = []
         
-        if len(edge_list) == 0:
-            edge_list = [[0, 1]]  # At least one edge
+        for _ in range(100):
+            # Random graph
+            num_nodes = int(rng.integers(3, max_nodes + 1))
+            x = x_buf[:num_nodes]
+            rng.random(out=x)
+            
+            # Random edges: one Bernoulli(0.5) draw per ordered node pair, no self-loops
+            pairs = pair_buf[:num_nodes * num_nodes]
+            rng.random(out=pairs)
+            mask = (pairs > 0.5).reshape(num_nodes, num_nodes)
+            np.fill_diagonal(mask, False)
+            src, dst = np.nonzero(mask)
+            edge_index = np.stack([src, dst]).astype(np.int64)
+            
+            if edge_index.shape[1] == 0:
+                edge_index = np.array([[0], [1]], dtype=np.int64)  # At least one edge
+            
+            edge_weight = ew_buf[:edge_index.shape[1]]
+            rng.random(out=edge_weight)
+            
+            probs, _, _ = predictor.predict_with_threshold(
+                x, edge_index, edge_weight
+            )
+            
+            all_probs.append(probs.ravel())
         
-        edge_index = torch.tensor(edge_list, dtype=torch.long).T
-        edge_weight = torch.rand(edge_index.shape[1])
+        all_probs = np.concatenate(all_probs)
         
-        probs, _, _ = predictor.predict_with_threshold(
-            x.numpy(), edge_index.numpy(), edge_weight.numpy()
-        )
+        print(f"\n  Min probability:  {all_probs.min():.4f}")
+        print(f"  Max probability:  {all_probs.max():.4f}")
+        print(f"  Mean probability: {all_probs.mean():.4f}")
+        print(f"  Std probability:  {all_probs.std():.4f}")
         
-        all_probs.extend(probs.flatten())
-    
-    all_probs = np.array(all_probs)
-    
-    print(f"\n  Min probability:  {all_probs.min():.4f}")
-    print(f"  Max probability:  {all_probs.max():.4f}")
-    print(f"  Mean probability: {all_probs.mean():.4f}")
-    print(f"  Std probability:  {all_probs.std():.4f}")
-    
-    # Check for pathological behavior
-    collapsed = (all_probs.max() - all_probs.min()) < 0.1
-    exploded = (all_probs > 0.99).sum() / len(all_probs) > 0.5
-    
-    if collapsed:
-        print("\n  ⚠️ Probabilities collapsed (low variance)")
-    elif exploded:
-        print("\n  ⚠️ Probabilities exploded (too many near 1.0)")
-    else:
-        print("\n  ✅ Probabilities well-calibrated (healthy range)")
+        # Check for pathological behavior
+        collapsed = (all_probs.max() - all_probs.min()) < 0.1
+        exploded = (all_probs > 0.99).sum() / len(all_probs) > 0.5
+        
+        if collapsed:
+            print("\n  ⚠️ Probabilities collapsed (low variance)")
+        elif exploded:
+            print("\n  ⚠️ Probabilities exploded (too many near 1.0)")
+        else:
+            print("\n  ✅ Probabilities well-calibrated (healthy range)")
 
 
 def main():
@@ -25,30 +25,30 @@ def test_temperature_scaling():
     # Test different temperatures
     temperatures = [0.3, 0.5, 1.0, 2.0]
     
-    for temp in temperatures:
-        predictor = ImpactPredictor(model_path=str(model_path), temperature=temp)
-        
-        # Create test scenario: Failed node with healthy neighbors
-        x = torch.tensor([
-            # Node 0: FAILED tank (status=0.0)
-            [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0,  # Type: Tank (one-hot)
-             0.0, 0.1, 0.0, 0.85, 0.9, 0.8, 0.7, 0.6, 0.8, 0.1, 0.1, 0.0],  # Features (status=0.0!)
-            
-            # Node 1: Healthy pump
-            [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0,  # Type: Pump
-             0.9, 0.8, 0.9, 0.75, 0.4, 0.2, 0.5, 0.7, 0.8, 0.1, 0.1, 0.0],
-            
-            # Node 2: Healthy pipe
-            [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0,  # Type: Pipe
-             0.9, 0.6, 0.7, 0.6, 0.3, 0.15, 0.4, 0.5, 0.6, 0.1, 0.1, 0.0],
-        ], dtype=torch.float32)
+    # One model load; temperature is applied per call at the very end
+    predictor = ImpactPredictor(model_path=str(model_path))
+    
+    # Create test scenario: Failed node with healthy neighbors
+    x = torch.tensor([
+        # Node 0: FAILED tank (status=0.0)
+        [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0,  # Type: Tank (one-hot)
+         0.0, 0.1, 0.0, 0.85, 0.9, 0.8, 0.7, 0.6, 0.8, 0.1, 0.1, 0.0],  # Features (status=0.0!)
         
-        edge_index = torch.tensor([[0, 1, 2], [1, 2, 0]], dtype=torch.long)
-        edge_weight = torch.tensor([0.9, 0.85, 0.8], dtype=torch.float32)
+        # Node 1: Healthy pump
+        [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0,  # Type: Pump
+         0.9, 0.8, 0.9, 0.75, 0.4, 0.2, 0.5, 0.7, 0.8, 0.1, 0.1, 0.0],
         
-        # Predict
+        # Node 2: Healthy pipe
+        [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0,  # Type: Pipe
+         0.9, 0.6, 0.7, 0.6, 0.3, 0.15, 0.4, 0.5, 0.6, 0.1, 0.1, 0.0],
+    ], dtype=torch.float32)
+    
+    edge_index = torch.tensor([[0, 1, 2], [1, 2, 0]], dtype=torch.long)
+    edge_weight = torch.tensor([0.9, 0.85, 0.8], dtype=torch.float32)
+    
+    for temp in temperatures:
         probs, alerts, risk = predictor.predict_with_threshold(
-            x.numpy(), edge_index.numpy(), edge_weight.numpy(), threshold=0.5
+            x, edge_index, edge_weight, threshold=0.5, temperature=temp
         )
         
         print(f"\n🌡️ Temperature: {temp:.1f}")
@@ -99,7 +99,7 @@ def test_status_veto():
         edge_weight = torch.tensor([0.9, 0.85, 0.8], dtype=torch.float32)
         
         probs, alerts, risk = predictor.predict_with_threshold(
-            x.numpy(), edge_index.numpy(), edge_weight.numpy(), threshold=0.5
+            x, edge_index, edge_weight, threshold=0.5
         )
         
         print(f"\n⚙️ Status Veto Weight: {veto_weight:.1f}")
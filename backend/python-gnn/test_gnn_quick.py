@@ -70,5 +70,5 @@ for node_result in nodes[:4]:  # Show top 4
     print(f'{name:<15} {delta:>8.3f}  {insight}')
 
 print('\n✅ GNN Simulation Test Complete!')
-print(f'   Model parameters: {sum(p.numel() for p in predictor.model.parameters()):,}')
+print(f'   Model parameters: {predictor.param_count:,}')
 print(f'   Device: {predictor.device}')
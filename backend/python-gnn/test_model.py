@@ -12,7 +12,7 @@ def test_gnn():
     
     # Load the trained model
     print("Loading trained model...")
-    predictor = ImpactPredictor(model_path="models/gnn_model.pt")
+    predictor = ImpactPredictor(model_path="models/gnn_model.pt", jit=True)
     print(f"✓ Model loaded on {predictor.device}\n")
     
     # Create a sample infrastructure graph (5 nodes)
@@ -71,18 +71,30 @@ def test_gnn():
         "Economic Loss", "Recovery Time", "Priority", "Confidence"
     ]
     
-    for i, name in enumerate(node_names):
+    # One contiguous array per metric (SoA), scaled once for display
+    cols = {label: np.ascontiguousarray(predictions[:, i]) for i, label in enumerate(output_labels)}
+    rows = zip(
+        node_names,
+        (cols["Probability"] * 100).tolist(),
+        (cols["Severity"] * 100).tolist(),
+        (cols["Time to Impact"] * 24).tolist(),
+        (cols["Water Impact"] * 100).tolist(),
+        (cols["Population Affected"] * 100).tolist(),
+        (cols["Economic Loss"] * 100).tolist(),
+        (cols["Priority"] * 100).tolist(),
+    )
+    
+    for name, probability, severity, hours, water, population, economic, priority in rows:
         print(f"📍 {name}:")
-        pred = predictions[i]
         
         # Show key metrics
-        print(f"   ├─ Impact Probability: {pred[0]*100:.1f}%")
-        print(f"   ├─ Severity Score:     {pred[1]*100:.1f}%")
-        print(f"   ├─ Time to Impact:     {pred[2]*24:.1f} hours")
-        print(f"   ├─ Water Impact:       {pred[3]*100:.1f}%")
-        print(f"   ├─ Population at Risk: {pred[7]*100:.1f}%")
-        print(f"   ├─ Economic Loss:      {pred[8]*100:.1f}%")
-        print(f"   └─ Priority Score:     {pred[10]*100:.1f}%")
+        print(f"   ├─ Impact Probability: {probability:.1f}%")
+        print(f"   ├─ Severity Score:     {severity:.1f}%")
+        print(f"   ├─ Time to Impact:     {hours:.1f} hours")
+        print(f"   ├─ Water Impact:       {water:.1f}%")
+        print(f"   ├─ Population at Risk: {population:.1f}%")
+        print(f"   ├─ Economic Loss:      {economic:.1f}%")
+        print(f"   └─ Priority Score:     {priority:.1f}%")
         print()
     
     # Summary
@@ -92,17 +104,16 @@ def test_gnn():
     
     # Find most affected node
     avg_impact = predictions.mean(axis=1)
-    most_affected = node_names[np.argmax(avg_impact)]
-    print(f"  Most Affected Node: {most_affected}")
-    print(f"  Average Impact:     {avg_impact.max()*100:.1f}%")
+    best_idx = int(avg_impact.argmax())
+    print(f"  Most Affected Node: {node_names[best_idx]}")
+    print(f"  Average Impact:     {avg_impact[best_idx]*100:.1f}%")
     
     # Find critical nodes (impact > 15%)
-    critical_mask = avg_impact > 0.15
-    critical_nodes = [n for n, c in zip(node_names, critical_mask) if c]
+    critical_nodes = [node_names[i] for i in np.flatnonzero(avg_impact > 0.15)]
     print(f"  Critical Nodes:     {', '.join(critical_nodes) if critical_nodes else 'None'}")
     
     print("\n✅ GNN Model Test Complete!")
-    print(f"   Model uses {sum(p.numel() for p in predictor.model.parameters()):,} learnable parameters")
+    print(f"   Model uses {predictor.param_count:,} learnable parameters")
     print(f"   Running on: {predictor.device}")
 
 
@@ -22,7 +22,7 @@ def test_simulation():
     
     # Load model
     print("\n📦 Loading model...")
-    engine = create_simulation_engine('models/gnn_production_v1.pt')
+    engine = create_simulation_engine('models/gnn_production_v1.pt', jit=True)
     print("✓ Model loaded")
     
     # Load real incident data
@@ -37,34 +37,30 @@ def test_simulation():
     
     # Test on first incident
     incident = incidents[0]
-    x = incident.x.numpy()
-    edge_index = incident.edge_index.numpy()
-    
-    num_nodes = x.shape[0]
+    # Tensors go to the engine as-is; only the setup below needs a NumPy view
+    x, edge_index, edge_weight = incident.x, incident.edge_index, incident.edge_attr
+    x_np = x.numpy()
     
     # Create node names (use types)
-    node_names = []
     type_map = {0: 'Road', 1: 'Building', 2: 'Power', 3: 'Tank', 
                 4: 'Pump', 5: 'Pipe', 6: 'Sensor', 7: 'Cluster',
                 8: 'Bridge', 9: 'School', 10: 'Hospital', 11: 'Market'}
     
-    for i in range(num_nodes):
-        type_idx = np.argmax(x[i, :12])
-        node_type = type_map.get(type_idx, 'Unknown')
-        node_names.append(f"{node_type}_{i}")
+    type_indices = np.argmax(x_np[:, :12], axis=1)
+    node_names = [f"{type_map.get(t, 'Unknown')}_{i}" for i, t in enumerate(type_indices)]
     
     # Find a node that's currently healthy (status > 0.5)
-    healthy_nodes = [i for i in range(num_nodes) if x[i, 12] > 0.5]
+    healthy_nodes = np.flatnonzero(x_np[:, 12] > 0.5)
     
     if len(healthy_nodes) == 0:
         print("⚠️  No healthy nodes to simulate")
         return
     
-    test_node = healthy_nodes[0]
+    test_node = int(healthy_nodes[0])
     
     print(f"\n🧪 TESTING ALL FAILURE MODES")
     print(f"   Target: {node_names[test_node]} (Node {test_node})")
-    print(f"   Original status: {x[test_node, 12]:.2f}")
+    print(f"   Original status: {x_np[test_node, 12]:.2f}")
     print("=" * 80)
     
     failure_modes = [
@@ -79,7 +75,7 @@ def test_simulation():
         print(f"{'='*80}")
         
         # Run simulation
-        report = engine.run_simulation(x, edge_index, test_node, node_names, failure_mode=mode)
+        report = engine.run_simulation(x, edge_index, edge_weight, [test_node], node_names, failure_mode=mode)
         
         # Display summary
         print("\n📊 SIMULATION RESULTS")
@@ -115,7 +111,7 @@ def test_semantic_interpretation():
     print("\nDemonstrating: Same Δ, different meanings based on failure mode\n")
     
     # Load model
-    engine = create_simulation_engine('models/gnn_production_v1.pt')
+    engine = create_simulation_engine('models/gnn_production_v1.pt', jit=True)
     
     # Simple 3-node graph: Source → Hub → Consumer
     x = np.array([
@@ -146,7 +142,7 @@ def test_semantic_interpretation():
     ]
     
     for mode, mode_name in modes_to_test:
-        report = engine.run_simulation(x, edge_index, 0, node_names, failure_mode=mode)
+        report = engine.run_simulation(x, edge_index, None, [0], node_names, failure_mode=mode)
         
         print(f"\n{mode_name.upper()}:")
         # Show pump interpretation
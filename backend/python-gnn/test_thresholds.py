@@ -5,7 +5,7 @@ Tests different critical node thresholds and compares performance
 
 import torch
 import torch.nn as nn
-from model import ImpactPredictor
+from model import ImpactPredictor, default_amp_dtype
 from incident_loader import load_real_incidents
 import numpy as np
 import json
@@ -19,13 +19,15 @@ def fine_tune_with_threshold(
     epochs: int = 20,
     lr: float = 1e-4,
     pos_weight_value: float = 5.0,
-    save_path: str = None
+    save_path: str = None,
+    incidents: list = None
 ):
     """
     Fine-tune with specific critical node threshold.
     
     Args:
         critical_threshold: Threshold for critical nodes (e.g., 0.2, 0.4, 0.5)
+        incidents: Pre-loaded incidents (skips loading incidents_file)
     """
     
     print("=" * 70)
@@ -34,7 +36,7 @@ def fine_tune_with_threshold(
     
     # Load pre-trained synthetic model
     print(f"\n📦 Loading synthetic model from {synthetic_model_path}...")
-    predictor = ImpactPredictor(model_path=synthetic_model_path)
+    predictor = ImpactPredictor(model_path=synthetic_model_path, amp_dtype=default_amp_dtype())
     model = predictor.model
     device = predictor.device
     print(f"✓ Model loaded successfully on {device}")
@@ -44,20 +46,25 @@ def fine_tune_with_threshold(
     for param in model.conv1.parameters():
         param.requires_grad = False
     
-    # Optimizer
-    optimizer = torch.optim.Adam(
-        filter(lambda p: p.requires_grad, model.parameters()),
-        lr=lr
-    )
+    # Optimizer (trainable parameter list is reused for gradient clipping)
+    trainable_params = [p for p in model.parameters() if p.requires_grad]
+    optimizer = torch.optim.Adam(trainable_params, lr=lr)
     
     # Loss with imbalance handling
     pos_weight = torch.tensor([pos_weight_value], device=device)
     criterion = nn.BCEWithLogitsLoss(pos_weight=pos_weight, reduction='none')
     
+    # Loss scaling is only needed if the predictor runs fp16 autocast
+    scaler = torch.cuda.amp.GradScaler(enabled=predictor.amp_dtype == torch.float16)
+    
     # Load real incidents
-    print(f"\n📂 Loading incidents from {incidents_file}...")
-    real_incidents = load_real_incidents(incidents_file)
-    print(f"✓ Loaded {len(real_incidents)} incidents")
+    if incidents is None:
+        print(f"\n📂 Loading incidents from {incidents_file}...")
+        incidents = load_real_incidents(incidents_file)
+    print(f"✓ Loaded {len(incidents)} incidents")
+    
+    # Incident graphs are small: move them to the device once, not every epoch
+    real_incidents = [data.to(device) for data in incidents]
     
     # Count critical nodes at this threshold
     critical_count = 0
@@ -82,11 +89,11 @@ def fine_tune_with_threshold(
         batches = 0
         
         for data in real_incidents:
-            data = data.to(device)
             optimizer.zero_grad()
             
-            # Forward pass
-            logits = model(data.x, data.edge_index, data.edge_attr)
+            # Forward pass (mixed precision when enabled)
+            with predictor.autocast():
+                logits = model(data.x, data.edge_index, data.edge_attr)
             
             # Mask unknown labels
             mask = data.y > -1
@@ -95,8 +102,8 @@ def fine_tune_with_threshold(
             if num_known == 0:
                 continue
             
-            # Compute base loss
-            loss_all = criterion(logits, data.y)
+            # Compute base loss (in fp32)
+            loss_all = criterion(logits.float(), data.y)
             
             # Apply THRESHOLD-BASED WEIGHTING
             # Critical nodes get extra weight
@@ -107,23 +114,20 @@ def fine_tune_with_threshold(
             critical_nodes = node_impacts > critical_threshold
             
             # Apply 3× weight to critical nodes
-            for i in range(data.y.shape[0]):
-                if critical_nodes[i]:
-                    weights[i, :] = 3.0
+            weights[critical_nodes] = 3.0
             
             # Weighted loss
             weighted_loss_all = loss_all * weights
             loss_masked = weighted_loss_all[mask].mean()
             
-            # Backward pass
-            loss_masked.backward()
+            # Backward pass (unscale before clipping so max_norm applies to true gradients)
+            scaler.scale(loss_masked).backward()
+            scaler.unscale_(optimizer)
             
-            torch.nn.utils.clip_grad_norm_(
-                filter(lambda p: p.requires_grad, model.parameters()),
-                max_norm=1.0
-            )
+            torch.nn.utils.clip_grad_norm_(trainable_params, max_norm=1.0)
             
-            optimizer.step()
+            scaler.step(optimizer)
+            scaler.update()
             
             total_loss += loss_masked.item()
             batches += 1
@@ -148,9 +152,14 @@ def fine_tune_with_threshold(
     return predictor, best_loss
 
 
-def evaluate_threshold_model(model_path: str, test_incidents_file: str, threshold_name: str):
+def evaluate_threshold_model(model_path: str, test_incidents_file: str, threshold_name: str,
+                             incidents: list = None, predictor: ImpactPredictor = None):
     """
     Evaluate a threshold-specific model.
+    
+    Args:
+        incidents: Pre-loaded incidents (skips loading test_incidents_file)
+        predictor: Already-loaded predictor for model_path (skips reloading the checkpoint)
     """
     from backtest import BacktestEngine
     
@@ -158,34 +167,27 @@ def evaluate_threshold_model(model_path: str, test_incidents_file: str, threshol
     print(f"📊 Evaluating: {threshold_name}")
     print(f"{'='*70}")
     
-    engine = BacktestEngine(model_path, threshold_name)
-    results = []
+    engine = BacktestEngine(model_path, threshold_name, predictor=predictor)
     
     # Load test data
-    incidents = load_real_incidents(test_incidents_file)
+    if incidents is None:
+        incidents = load_real_incidents(test_incidents_file)
     
-    for data in incidents:
-        result = engine.backtest_incident(data, k=5)
-        if 'error' not in result:
-            results.append(result)
+    # One batched forward pass over all incidents, metrics still per incident
+    results = [r for r in engine.backtest_incidents(incidents, k=5) if 'error' not in r]
     
-    # Compute averages
+    # Compute averages (one contiguous column per metric)
     if len(results) > 0:
-        avg_mae = np.mean([r['mae'] for r in results])
-        avg_accuracy = np.mean([r['accuracy'] for r in results])
-        avg_precision = np.mean([r['precision'] for r in results])
-        avg_recall = np.mean([r['recall'] for r in results])
-        avg_f1 = np.mean([r['f1_score'] for r in results])
-        
-        return {
-            'threshold_name': threshold_name,
-            'mae': avg_mae,
-            'accuracy': avg_accuracy,
-            'precision': avg_precision,
-            'recall': avg_recall,
-            'f1_score': avg_f1,
-            'num_incidents': len(results)
+        metrics = ('mae', 'accuracy', 'precision', 'recall', 'f1_score')
+        columns = {
+            m: np.fromiter((r[m] for r in results), dtype=np.float64, count=len(results))
+            for m in metrics
         }
+        
+        summary = {'threshold_name': threshold_name}
+        summary.update({m: float(columns[m].mean()) for m in metrics})
+        summary['num_incidents'] = len(results)
+        return summary
     
     return None
 
@@ -202,25 +204,32 @@ def run_threshold_comparison():
     thresholds = [0.2, 0.4, 0.5]
     results_summary = []
     
+    # Parse incidents once and share them across all sweeps
+    incidents_file = "data/real_incidents.json"
+    real_incidents = load_real_incidents(incidents_file)
+    
     # Fine-tune with each threshold
     for threshold in thresholds:
         model_path = f"models/gnn_threshold_{threshold:.1f}.pt"
         
         predictor, best_loss = fine_tune_with_threshold(
             synthetic_model_path="models/gnn_model.pt",
-            incidents_file="data/real_incidents.json",
+            incidents_file=incidents_file,
             critical_threshold=threshold,
             epochs=20,
             lr=1e-4,
             pos_weight_value=5.0,
-            save_path=model_path
+            save_path=model_path,
+            incidents=real_incidents
         )
         
-        # Evaluate
+        # Evaluate (the fine-tuned predictor holds exactly the saved weights)
         result = evaluate_threshold_model(
             model_path=model_path,
-            test_incidents_file="data/real_incidents.json",
-            threshold_name=f"Threshold {threshold:.1f}"
+            test_incidents_file=incidents_file,
+            threshold_name=f"Threshold {threshold:.1f}",
+            incidents=real_incidents,
+            predictor=predictor
         )
         
         if result:
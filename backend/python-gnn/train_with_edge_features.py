@@ -4,14 +4,116 @@ Adds edge-level features (health, throughput, age) for better predictions
 """
 
 import torch
+import torch.distributed as dist
 import numpy as np
 from torch_geometric.data import Data
-from torch_geometric.loader import DataLoader
 from model import ImpactPredictor
+from train import precompute_batches, is_distributed_launch
+from pathlib import Path
 import os
 
+# Opt-in on-disk cache for seeded datasets (set VILLAGE_GNN_CACHE=1)
+DATASET_CACHE_DIR = Path.home() / ".cache" / "village-gnn" / "datasets"
 
-def generate_training_data_with_edge_features(num_samples=1000, num_nodes_range=(10, 30)):
+# Optional compiled cascade kernel (falls back to the vectorized NumPy version)
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+def _propagate_cascade_numpy(indptr, indices, eids, edge_quality, failure_node, y, rand_pool, max_depth=3):
+    """
+    Propagate failure impact up to max_depth hops, in place on y.
+    
+    Each newly reached node takes its parent's impact times the hop decay,
+    an edge-quality factor and 0.5 + 0.5 * rand_pool[node]. The first
+    frontier edge to reach a node is the one it propagates through.
+    """
+    num_nodes = y.shape[0]
+    visited = np.zeros(num_nodes, dtype=bool)
+    visited[failure_node] = True
+    current_layer = np.array([failure_node])
+    decay_factor = 0.7
+    
+    for depth in range(max_depth):
+        # Gather every frontier node's out-edges: (parent, neighbor, edge id)
+        starts = indptr[current_layer]
+        counts = indptr[current_layer + 1] - starts
+        positions = np.repeat(starts, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        parents = np.repeat(current_layer, counts)
+        neighbors = indices[positions]
+        edge_ids = eids[positions]
+        
+        keep = ~visited[neighbors]
+        parents, neighbors, edge_ids = parents[keep], neighbors[keep], edge_ids[keep]
+        
+        _, first = np.unique(neighbors, return_index=True)
+        first.sort()
+        next_layer, parents, edge_ids = neighbors[first], parents[first], edge_ids[first]
+        
+        # Poor edge quality reduces impact propagation
+        quality_factor = 0.5 + 0.5 * edge_quality[edge_ids]
+        
+        update = rand_pool[next_layer] * 0.5
+        update += 0.5
+        update *= (decay_factor * quality_factor)[:, None]
+        update *= y[parents]
+        y[next_layer] = update
+        visited[next_layer] = True
+        
+        current_layer = next_layer
+        decay_factor *= 0.7
+
+
+def _propagate_cascade_loops(indptr, indices, eids, edge_quality, failure_node, y, rand_pool, max_depth=3):
+    """Scalar-loop version of _propagate_cascade_numpy, for Numba"""
+    num_nodes = y.shape[0]
+    visited = np.zeros(num_nodes, dtype=np.bool_)
+    frontier = np.empty(num_nodes, dtype=np.int64)
+    next_frontier = np.empty(num_nodes, dtype=np.int64)
+    visited[failure_node] = True
+    frontier[0] = failure_node
+    frontier_size = 1
+    decay_factor = 0.7
+    
+    for depth in range(max_depth):
+        next_size = 0
+        for f in range(frontier_size):
+            parent = frontier[f]
+            for k in range(indptr[parent], indptr[parent + 1]):
+                nbr = indices[k]
+                if visited[nbr]:
+                    continue
+                # Poor edge quality reduces impact propagation
+                quality_factor = 0.5 + 0.5 * edge_quality[eids[k]]
+                for c in range(y.shape[1]):
+                    y[nbr, c] = y[parent, c] * decay_factor * quality_factor * (0.5 + 0.5 * rand_pool[nbr, c])
+                visited[nbr] = True
+                next_frontier[next_size] = nbr
+                next_size += 1
+        
+        frontier, next_frontier = next_frontier, frontier
+        frontier_size = next_size
+        decay_factor *= 0.7
+
+
+if HAS_NUMBA:
+    propagate_cascade = njit(cache=True)(_propagate_cascade_loops)
+    
+    # Compile once at import (cache=True reuses the binary across runs)
+    propagate_cascade(
+        np.array([0, 1, 1], dtype=np.int64), np.array([1], dtype=np.int64),
+        np.array([0], dtype=np.int64), np.ones(1, dtype=np.float32), 0,
+        np.ones((2, 12), dtype=np.float32), np.ones((2, 12), dtype=np.float32)
+    )
+else:
+    propagate_cascade = _propagate_cascade_numpy
+
+
+def generate_training_data_with_edge_features(num_samples=1000, num_nodes_range=(10, 30), seed=None,
+                                              store_3d=False):
     """
     Generate synthetic training data WITH edge features
     
@@ -19,102 +121,93 @@ def generate_training_data_with_edge_features(num_samples=1000, num_nodes_range=
     - Connection health (0-1)
     - Throughput capacity (0-1)
     - Age/degradation (0-1, where 1 is new, 0 is old)
+    
+    Args:
+        seed: Optional seed for reproducible datasets (e.g. identical across DDP ranks)
+        store_3d: Also keep the raw (num_edges, 3) features as data.edge_features_3d
+                  (off by default: the current model only reads edge_attr)
     """
     print("Generating enhanced training data with edge features...")
+    rng = np.random.default_rng(seed)
     data_list = []
     
+    # Draw every sample's graph size up front
+    n_nodes = rng.integers(num_nodes_range[0], num_nodes_range[1], size=num_samples)
+    
+    # Label-noise scratch buffer, reused by every sample
+    noise_buf = np.empty((num_nodes_range[1], 12), dtype=np.float32)
+    
     for i in range(num_samples):
-        num_nodes = np.random.randint(num_nodes_range[0], num_nodes_range[1])
+        num_nodes = int(n_nodes[i])
         
         # Node features (24 dimensions)
-        x = np.random.rand(num_nodes, 24).astype(np.float32)
-        
-        # Create graph structure
-        edge_list = []
-        edge_feature_list = []
-        
-        for node_idx in range(num_nodes):
-            num_connections = np.random.randint(2, min(6, num_nodes))
-            neighbors = np.random.choice(num_nodes, size=num_connections, replace=False)
-            
-            for neighbor in neighbors:
-                if neighbor != node_idx:
-                    edge_list.append([node_idx, neighbor])
-                    
-                    # Edge features: [health, throughput, age]
-                    edge_health = np.random.rand()  # Connection integrity
-                    edge_throughput = np.random.rand()  # Capacity
-                    edge_age = np.random.rand()  # Maintenance/age factor
-                    
-                    edge_feature_list.append([edge_health, edge_throughput, edge_age])
-        
-        if len(edge_list) == 0:
-            edge_list = [[0, 1], [1, 0]]
-            edge_feature_list = [[0.8, 0.7, 0.9], [0.8, 0.7, 0.9]]
-        
-        edge_index = torch.tensor(edge_list, dtype=torch.long).t().contiguous()
+        x = rng.random((num_nodes, 24), dtype=np.float32)
+        
+        # Create graph structure: each node picks the first num_connections
+        # entries of a random permutation (no repeats), self-picks dropped
+        num_connections = rng.integers(2, min(6, num_nodes), size=num_nodes)
+        picks = np.argsort(rng.random((num_nodes, num_nodes)), axis=1)[:, :5]
+        src = np.repeat(np.arange(num_nodes), num_connections)
+        dst = picks[np.arange(picks.shape[1]) < num_connections[:, None]]
+        not_self = src != dst
+        edge_list = np.stack([src[not_self], dst[not_self]]).astype(np.int64)
+        
+        # Edge features: [health, throughput, age]
+        # (connection integrity, capacity, maintenance/age factor)
+        edge_feature_list = rng.random((edge_list.shape[1], 3), dtype=np.float32)
+        
+        if edge_list.shape[1] == 0:
+            edge_list = np.array([[0, 1], [1, 0]], dtype=np.int64)
+            edge_feature_list = np.array([[0.8, 0.7, 0.9], [0.8, 0.7, 0.9]], dtype=np.float32)
         
         # Convert 3D edge features to 1D edge weights (average of health, throughput, age)
         # This allows compatibility with current GCN/GAT architecture
-        edge_weights_list = [np.mean(feat) for feat in edge_feature_list]
-        edge_attr = torch.tensor(edge_weights_list, dtype=torch.float32)
-        
-        # Store full 3D features for future use (not used in current model)
-        edge_features_3d = torch.tensor(edge_feature_list, dtype=torch.float32)
+        edge_weights = edge_feature_list.mean(axis=1)
         
         # Generate ground truth labels
-        failure_node = np.random.randint(0, num_nodes)
+        failure_node = int(rng.integers(num_nodes))
         y = np.zeros((num_nodes, 12), dtype=np.float32)
         
         failure_node_type = np.argmax(x[failure_node, :12])
         critical_types = [2, 3, 9, 10]
         base_impact = 0.85 if failure_node_type in critical_types else 0.7
-        y[failure_node] = np.random.rand(12) * 0.2 + base_impact
+        y[failure_node] = rng.random(12) * 0.2 + base_impact
+        
+        # CSR adjacency: out-edges of u are order[indptr[u]:indptr[u + 1]]
+        src, dst = edge_list
+        order = np.argsort(src, kind='stable')
+        indices = dst[order]
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=num_nodes), out=indptr[1:])
         
         # BFS propagation with edge feature consideration
-        visited = set([failure_node])
-        current_layer = [failure_node]
-        decay_factor = 0.7
-        
-        for depth in range(3):
-            next_layer = []
-            for node in current_layer:
-                neighbors_mask = (edge_index[0] == node).numpy()
-                neighbors = edge_index[1][neighbors_mask].numpy()
-                edge_indices = np.where(neighbors_mask)[0]
-                
-                for neighbor, edge_idx in zip(neighbors, edge_indices):
-                    if neighbor not in visited:
-                        # Consider edge quality in impact propagation
-                        edge_quality = edge_attr[edge_idx].mean().item()  # avg of health, throughput, age
-                        
-                        # Poor edge quality reduces impact propagation
-                        quality_factor = 0.5 + 0.5 * edge_quality
-                        
-                        y[neighbor] = y[node] * decay_factor * quality_factor * (0.5 + np.random.rand(12) * 0.5)
-                        visited.add(neighbor)
-                        next_layer.append(neighbor)
-            
-            current_layer = next_layer
-            decay_factor *= 0.7
-        
-        y += np.random.randn(num_nodes, 12) * 0.05
-        y = np.clip(y, 0, 1)
-        
-        # Normalize node features
-        x_mean = x.mean(axis=0, keepdims=True)
-        x_std = x.std(axis=0, keepdims=True) + 1e-6
-        x = (x - x_mean) / x_std
-        x = np.clip(x, -3, 3)
+        # (one U(0, 1) row per node, used if/when the node is reached)
+        rand_pool = rng.random((num_nodes, 12), dtype=np.float32)
+        propagate_cascade(indptr, indices, order, edge_weights, failure_node, y, rand_pool)
+        
+        noise = noise_buf[:num_nodes]
+        rng.standard_normal(dtype=np.float32, out=noise)
+        noise *= 0.05
+        y += noise
+        np.clip(y, 0, 1, out=y)
         
+        # Normalize node features (in place, no temporaries)
+        x_std = x.std(axis=0, keepdims=True)
+        x_std += 1e-6
+        x -= x.mean(axis=0, keepdims=True)
+        x /= x_std
+        np.clip(x, -3, 3, out=x)
+        
+        # Everything above stays in NumPy; wrap (without copying) only here
         data = Data(
-            x=torch.tensor(x, dtype=torch.float32),
-            edge_index=edge_index,
-            edge_attr=edge_attr,  # 1D edge weights (averaged from 3D features)
-            y=torch.tensor(y, dtype=torch.float32)
+            x=torch.from_numpy(x),
+            edge_index=torch.from_numpy(edge_list),
+            edge_attr=torch.from_numpy(edge_weights),  # 1D edge weights (averaged from 3D features)
+            y=torch.from_numpy(y)
         )
-        # Store 3D features as metadata (for future edge-feature-aware models)
-        data.edge_features_3d = edge_features_3d
+        if store_3d:
+            # Store 3D features as metadata (for future edge-feature-aware models)
+            data.edge_features_3d = torch.from_numpy(edge_feature_list)
         
         data_list.append(data)
         
@@ -125,26 +218,101 @@ def generate_training_data_with_edge_features(num_samples=1000, num_nodes_range=
     return data_list
 
 
-def train_with_edge_features(num_epochs=50, batch_size=32, save_path='models/gnn_model_edge_features.pt'):
+def load_or_generate_edge_feature_data(num_samples, num_nodes_range=(10, 30), seed=None):
+    """
+    generate_training_data_with_edge_features, cached to disk when possible.
+    
+    Only seeded datasets with VILLAGE_GNN_CACHE=1 are cached (unseeded ones
+    are never reproducible). The key also covers this file's mtime, so
+    editing the generator invalidates old entries.
+    """
+    if os.environ.get("VILLAGE_GNN_CACHE") != "1" or seed is None:
+        return generate_training_data_with_edge_features(num_samples, num_nodes_range, seed=seed)
+    
+    version = Path(__file__).stat().st_mtime_ns
+    cache_path = DATASET_CACHE_DIR / (
+        f"edge_features_n{num_samples}_{num_nodes_range[0]}-{num_nodes_range[1]}_s{seed}_{version}.pt"
+    )
+    if cache_path.exists():
+        print(f"Loading cached training data from {cache_path}")
+        return torch.load(cache_path, weights_only=False)
+    
+    data_list = generate_training_data_with_edge_features(num_samples, num_nodes_range, seed=seed)
+    
+    # Write under a temporary name first so a concurrent reader never sees a partial file
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    torch.save(data_list, tmp_path)
+    os.replace(tmp_path, cache_path)
+    return data_list
+
+
+def train_with_edge_features(num_epochs=50, batch_size=32, save_path='models/gnn_model_edge_features.pt',
+                             compile_model=False):
     """
     Train GNN with edge features enabled
+    
+    Single-process by default. Under `torchrun --nproc_per_node=N
+    train_with_edge_features.py` each rank trains a DistributedDataParallel
+    replica on its shard of the batches; only rank 0 logs and saves.
+    
+    Args:
+        compile_model: Run training steps and validation through torch.compile (falls back to eager on failure)
     """
-    print("\n" + "="*60)
-    print("🔗 Training GNN with Edge Features")
-    print("="*60 + "\n")
+    distributed = is_distributed_launch()
+    rank = 0
+    device = None
+    if distributed:
+        dist.init_process_group(backend="nccl")
+        rank = dist.get_rank()
+        local_rank = int(os.environ["LOCAL_RANK"])
+        torch.cuda.set_device(local_rank)
+        device = torch.device("cuda", local_rank)
+    is_main = rank == 0
     
-    # Generate enhanced data
-    train_data = generate_training_data_with_edge_features(num_samples=800)
-    val_data = generate_training_data_with_edge_features(num_samples=200)
+    if is_main:
+        print("\n" + "="*60)
+        print("🔗 Training GNN with Edge Features")
+        print("="*60 + "\n")
     
-    train_loader = DataLoader(train_data, batch_size=batch_size, shuffle=True)
-    val_loader = DataLoader(val_data, batch_size=batch_size, shuffle=False)
+    # Generate enhanced data (seeded under DDP so every rank builds the same
+    # dataset, and when caching so later runs can load it from disk)
+    seeded = distributed or os.environ.get("VILLAGE_GNN_CACHE") == "1"
+    train_data = load_or_generate_edge_feature_data(num_samples=800, seed=0 if seeded else None)
+    val_data = load_or_generate_edge_feature_data(num_samples=200, seed=1 if seeded else None)
     
     # Initialize model
-    predictor = ImpactPredictor()
-    print(f"Model initialized on device: {predictor.device}")
-    print(f"Model parameters: {sum(p.numel() for p in predictor.model.parameters()):,}")
-    print(f"Edge features: 3D (health, throughput, age)\n")
+    predictor = ImpactPredictor(device=device)
+    if distributed:
+        predictor.distribute_for_training(device_ids=[device.index])
+    if compile_model:
+        # Batches differ in node/edge count, so compile with symbolic shapes
+        predictor.compile_for_training(dynamic=True)
+    if is_main:
+        print(f"Model initialized on device: {predictor.device}")
+        print(f"Model parameters: {predictor.param_count:,}")
+        print(f"Edge features: 3D (health, throughput, age)\n")
+    
+    # Collate once up front and keep the batches on the device; epochs only
+    # reshuffle batch order instead of re-running from_data_list per step
+    train_batches = precompute_batches(train_data, batch_size, predictor.device)
+    val_batches = precompute_batches(val_data, batch_size, predictor.device)
+    
+    if compile_model:
+        # Warm up on a real validation batch (same dtypes and attributes as later calls)
+        first = val_batches[0]
+        predictor.compile_for_inference(example_graph=(first.x, first.edge_index, first.edge_attr), dynamic=True)
+    
+    if distributed:
+        # Equal shard sizes so every rank runs the same number of DDP steps
+        world_size = dist.get_world_size()
+        usable = len(train_batches) // world_size * world_size
+        if usable == 0:
+            raise ValueError(
+                f"{len(train_batches)} training batches can't be sharded across {world_size} ranks; "
+                f"lower batch_size or use fewer processes"
+            )
+        train_batches = train_batches[:usable][rank::world_size]
     
     # Training loop (same as before)
     best_val_loss = float('inf')
@@ -152,55 +320,69 @@ def train_with_edge_features(num_epochs=50, batch_size=32, save_path='models/gnn
     for epoch in range(num_epochs):
         # Training
         predictor.model.train()
-        train_losses = []
+        train_loss_sum = torch.zeros((), device=predictor.device)
         
-        for batch in train_loader:
-            loss = predictor.train_step(batch)
-            train_losses.append(loss)
+        for i in np.random.permutation(len(train_batches)):
+            train_loss_sum += predictor.train_step(train_batches[i])
         
-        avg_train_loss = np.mean(train_losses)
+        # Single device→host sync per epoch
+        avg_train_loss = (train_loss_sum / len(train_batches)).item()
         
         # Validation
-        predictor.model.eval()
         val_losses = []
         
-        with torch.no_grad():
-            for batch in val_loader:
-                batch = batch.to(predictor.device)
-                out = predictor.model(batch.x, batch.edge_index, batch.edge_attr, batch.batch)
+        with torch.inference_mode():
+            for batch in val_batches:
+                # Eval mode, compiled if requested (falls back to eager on failure)
+                out = predictor.inference_logits(batch.x, batch.edge_index, batch.edge_attr, batch.batch)
                 
+                # Critical nodes (mean impact > 0.5) weigh 3x, broadcast per node
                 loss_per_node = predictor.criterion(out, batch.y)
-                weights = torch.ones_like(batch.y)
-                critical_mask = batch.y.mean(dim=1) > 0.5
-                weights[critical_mask] = 3.0
-                loss = (loss_per_node * weights).mean()
+                critical_mask = (batch.y.mean(dim=1) > 0.5).float()
+                loss = (loss_per_node * (1.0 + 2.0 * critical_mask.unsqueeze(1))).mean()
                 
-                val_losses.append(loss.item())
+                val_losses.append(loss)
         
-        avg_val_loss = np.mean(val_losses)
+        # Reduced outside inference_mode so all_reduce can update it in place
+        avg_val_loss = torch.stack(val_losses).mean()
+        if distributed:
+            # BatchNorm running stats come from each rank's own last batches, so
+            # eval-mode losses differ per rank; average them so every rank's
+            # scheduler and best-model check see the same value
+            dist.all_reduce(avg_val_loss)
+            avg_val_loss /= dist.get_world_size()
         
-        # Scheduler step
+        # One device→host sync per epoch instead of one per batch
+        avg_val_loss = avg_val_loss.item()
+        
+        # Scheduler step (identical loss on every rank)
         predictor.scheduler.step(avg_val_loss)
         current_lr = predictor.optimizer.param_groups[0]['lr']
         
-        # Print progress
-        print(f"Epoch {epoch+1:3d}/{num_epochs} | "
-              f"Train Loss: {avg_train_loss:.4f} | "
-              f"Val Loss: {avg_val_loss:.4f} | "
-              f"LR: {current_lr:.6f}")
+        # Print progress (train loss is rank 0's shard under DDP)
+        if is_main:
+            print(f"Epoch {epoch+1:3d}/{num_epochs} | "
+                  f"Train Loss: {avg_train_loss:.4f} | "
+                  f"Val Loss: {avg_val_loss:.4f} | "
+                  f"LR: {current_lr:.6f}")
         
         # Save best model
         if avg_val_loss < best_val_loss:
             best_val_loss = avg_val_loss
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            predictor.save_model(save_path)
-            print(f"  ✓ New best model saved (Val Loss: {best_val_loss:.4f})")
+            if is_main:
+                os.makedirs(os.path.dirname(save_path), exist_ok=True)
+                predictor.save_model(save_path)
+                print(f"  ✓ New best model saved (Val Loss: {best_val_loss:.4f})")
+    
+    if is_main:
+        print("\n" + "="*60)
+        print("✅ Training with Edge Features Complete!")
+        print(f"Best Validation Loss: {best_val_loss:.4f}")
+        print(f"Comparison with base model (0.6700): {best_val_loss/0.6700:.2%}")
+        print("="*60 + "\n")
     
-    print("\n" + "="*60)
-    print("✅ Training with Edge Features Complete!")
-    print(f"Best Validation Loss: {best_val_loss:.4f}")
-    print(f"Comparison with base model (0.6700): {best_val_loss/0.6700:.2%}")
-    print("="*60 + "\n")
+    if distributed:
+        dist.destroy_process_group()
     
     return predictor
 
@@ -215,6 +397,9 @@ if __name__ == "__main__":
     
     trained_model = train_with_edge_features(num_epochs=50, batch_size=32)
     
+    if int(os.environ.get("RANK", "0")) != 0:
+        raise SystemExit(0)
+    
     print("\n💡 Expected Improvements:")
     print("  • Better cascade prediction through degraded infrastructure")
     print("  • Recognition of bottleneck edges (low throughput)")
@@ -8,7 +8,15 @@ import numpy as np
 from model import ImpactPredictor
 from pathlib import Path
 
-def test_threshold_independence():
+# Shared test graph (4 nodes with 24 features, 3 edges)
+PROBE_GRAPH = (
+    torch.rand(4, 24),
+    torch.tensor([[0, 1, 2], [1, 2, 3]], dtype=torch.long),
+    torch.tensor([0.9, 0.85, 0.8], dtype=torch.float32)
+)
+
+
+def test_threshold_independence(predictor):
     """
     Test 1: Model outputs should be threshold-independent
     Probabilities should stay constant, only alerts should change
@@ -17,18 +25,7 @@ def test_threshold_independence():
     print("TEST 1: Threshold Independence")
     print("="*70)
     
-    # Load model with absolute path
-    script_dir = Path(__file__).parent
-    model_path = script_dir / "models" / "gnn_production_v1.pt"
-    if not model_path.exists():
-        model_path = script_dir / "models" / "gnn_model.pt"
-    
-    predictor = ImpactPredictor(model_path=str(model_path))
-    
-    # Create test graph (4 nodes, 3 edges)
-    x = torch.rand(4, 24)  # 4 nodes with 24 features
-    edge_index = torch.tensor([[0, 1, 2], [1, 2, 3]], dtype=torch.long)
-    edge_weight = torch.tensor([0.9, 0.85, 0.8], dtype=torch.float32)
+    x, edge_index, edge_weight = PROBE_GRAPH
     
     # Run predictions with different thresholds
     thresholds = [0.3, 0.5, 0.7]
@@ -36,7 +33,7 @@ def test_threshold_independence():
     
     for threshold in thresholds:
         probs, alerts, risk = predictor.predict_with_threshold(
-            x.numpy(), edge_index.numpy(), edge_weight.numpy(), threshold=threshold
+            x, edge_index, edge_weight, threshold=threshold
         )
         results[threshold] = {
             'probabilities': probs,
@@ -73,7 +70,7 @@ def test_threshold_independence():
     return match_05 and match_07
 
 
-def test_threshold_effect():
+def test_threshold_effect(predictor):
     """
     Test 2: Alerts should respect threshold boundary
     Lower threshold = more alerts
@@ -82,18 +79,7 @@ def test_threshold_effect():
     print("TEST 2: Threshold Effect on Alerts")
     print("="*70)
     
-    # Load model with absolute path
-    script_dir = Path(__file__).parent
-    model_path = script_dir / "models" / "gnn_production_v1.pt"
-    if not model_path.exists():
-        model_path = script_dir / "models" / "gnn_model.pt"
-    
-    predictor = ImpactPredictor(model_path=str(model_path))
-    
-    # Create test graph
-    x = torch.rand(4, 24)
-    edge_index = torch.tensor([[0, 1, 2], [1, 2, 3]], dtype=torch.long)
-    edge_weight = torch.tensor([0.9, 0.85, 0.8], dtype=torch.float32)
+    x, edge_index, edge_weight = PROBE_GRAPH
     
     # Run predictions
     thresholds = [0.3, 0.5, 0.7]
@@ -101,7 +87,7 @@ def test_threshold_effect():
     
     for threshold in thresholds:
         probs, alerts, risk = predictor.predict_with_threshold(
-            x.numpy(), edge_index.numpy(), edge_weight.numpy(), threshold=threshold
+            x, edge_index, edge_weight, threshold=threshold
         )
         alert_count = alerts.sum()
         alert_counts.append(alert_count)
@@ -111,17 +97,14 @@ def test_threshold_effect():
         print(f"  Alert Rate: {(alert_count/alerts.size)*100:.1f}%")
         
         # Verify alerts match threshold
-        correct_alerts = True
-        for i in range(len(probs)):
-            for j in range(probs.shape[1]):
-                if alerts[i, j] == 1:
-                    if probs[i, j] < threshold:
-                        correct_alerts = False
-                        print(f"  ❌ Alert at P={probs[i,j]:.3f} < threshold={threshold}")
-                else:
-                    if probs[i, j] >= threshold:
-                        correct_alerts = False
-                        print(f"  ❌ No alert at P={probs[i,j]:.3f} >= threshold={threshold}")
+        expected = (probs >= threshold).astype(alerts.dtype)
+        mismatches = np.argwhere(expected != alerts)
+        correct_alerts = (mismatches.size == 0)
+        for i, j in mismatches[:5]:
+            if alerts[i, j] == 1:
+                print(f"  ❌ Alert at P={probs[i,j]:.3f} < threshold={threshold}")
+            else:
+                print(f"  ❌ No alert at P={probs[i,j]:.3f} >= threshold={threshold}")
         
         if correct_alerts:
             print(f"  ✓ All alerts correctly placed")
@@ -145,7 +128,7 @@ def test_threshold_effect():
     return correct_ordering
 
 
-def test_probability_calibration():
+def test_probability_calibration(predictor):
     """
     Test 3: Probabilities should be in valid range [0, 1]
     """
@@ -153,22 +136,11 @@ def test_probability_calibration():
     print("TEST 3: Probability Calibration")
     print("="*70)
     
-    # Load model with absolute path
-    script_dir = Path(__file__).parent
-    model_path = script_dir / "models" / "gnn_production_v1.pt"
-    if not model_path.exists():
-        model_path = script_dir / "models" / "gnn_model.pt"
-    
-    predictor = ImpactPredictor(model_path=str(model_path))
-    
-    # Create test graph
-    x = torch.rand(4, 24)
-    edge_index = torch.tensor([[0, 1, 2], [1, 2, 3]], dtype=torch.long)
-    edge_weight = torch.tensor([0.9, 0.85, 0.8], dtype=torch.float32)
+    x, edge_index, edge_weight = PROBE_GRAPH
     
     # Run prediction
     probs, alerts, risk = predictor.predict_with_threshold(
-        x.numpy(), edge_index.numpy(), edge_weight.numpy(), threshold=0.5
+        x, edge_index, edge_weight, threshold=0.5
     )
     
     # Check calibration
@@ -203,10 +175,22 @@ def main():
     print("Testing inference-time threshold implementation...")
     print("This verifies that thresholds do NOT affect training.\n")
     
+    # Load model once with absolute path, shared by all tests
+    script_dir = Path(__file__).parent
+    model_path = script_dir / "models" / "gnn_production_v1.pt"
+    if not model_path.exists():
+        model_path = script_dir / "models" / "gnn_model.pt"
+    
+    predictor = ImpactPredictor(model_path=str(model_path))
+    
+    # Every test predicts on the same fixed-size probe graph: warm up on it so
+    # compiled kernels (and CUDA graphs) are reused by every call
+    predictor.compile_for_inference(example_graph=PROBE_GRAPH, mode="reduce-overhead")
+    
     # Run tests
-    test1_pass = test_threshold_independence()
-    test2_pass = test_threshold_effect()
-    test3_pass = test_probability_calibration()
+    test1_pass = test_threshold_independence(predictor)
+    test2_pass = test_threshold_effect(predictor)
+    test3_pass = test_probability_calibration(predictor)
     
     # Summary
     print("\n\n" + "="*70)